@@ -7,3 +7,91 @@ MIDIChannel = 1
 TransportChan = 14
 # The MIDI channel used for the transport controls (Play/Stop/Record/etc).
 # This must match the "Transport Button MIDI Channel" in the Korg Kontrol Editor.
+
+ExtraUnits = []
+# Additional nanoKONTROL2 units on the same MIDI port, as (MIDIChannel, TransportChan) pairs, e.g. [(2, 15)].
+# Each unit needs its own channels set in the Korg Kontrol Editor, all units share one group index.
+# Unit N starts on group bank N; MODE + M of a strip switches the bank of that unit only.
+
+RepeatDelay = 0.4
+# Seconds PREV/NEXT (tracks), MODE + PREV/NEXT (patterns) and MARKER ◄/► must be held before they repeat.
+
+RepeatRate = 8
+# Repeats per second once repeating, accelerating to RepeatMaxRate over 2 seconds. 0 disables hold-to-repeat.
+
+RepeatMaxRate = 40
+# Highest repeat rate. Repeats due within one idle tick are sent as a single multi-step move.
+
+FaderMaxRate = 0
+# Maximum number of volume updates per second applied for each fader group.
+# 0 applies the latest fader position once per idle tick.
+
+FaderDeadBand = 0
+# While a fader is moving, position changes smaller than this many steps (out of 127) are held back.
+# The exact final position is always applied once the fader stops.
+
+FaderCurve = 'linear'
+# Response of the faders: 'linear', 'exponential' (each step multiplies the mixer fader position, 1000:1 span),
+# 'audio' (audio taper) or 'custom' (breakpoints of FaderCurvePoints). The full fader position gives the mixer's 0 dB.
+# The curves shape FL Studio's mixer fader position (0.8 is 0 dB), not a gain in dB.
+
+FaderCurvePoints = [(0, 0.0), (64, 0.5), (127, 1.0)]
+# Breakpoints of the 'custom' curve as (fader value 0-127, fraction of the 0 dB mixer fader position).
+
+GroupGains = {}
+# Multiplier of the mixer fader position per group number, applied on top of the fader curve, e.g. {1: 0.9, 4: 1.1}.
+# This is not a dB trim: FL Studio's mixer position is not linear in amplitude (0.8 is 0 dB, 1.0 about +5.6 dB).
+
+GroupMaxVolumes = {}
+# Highest mixer volume a group's faders and fades can reach, per group number (0.8 is 0 dB, 1.0 is the maximum),
+# e.g. {2: 0.7}. Groups not listed stop at 0 dB.
+
+MeterMode = 'clip'
+# Metering shown on the strip LEDs while enabled with MODE + RECORD:
+# 'clip' lights the LED of a group whose masters reach 0 dBFS, 'activity' while they play a signal.
+
+MeterButton = 'R'
+# LED row used by metering, 'R' or 'S'. It shows the meter instead of the arm/solo state while metering is on.
+
+MeterReadsPerTick = 4
+# Maximum number of mixer peak reads per idle tick, shared round-robin by the master tracks of the shown groups.
+
+ProfileHostCalls = False
+# Record every FL Studio API call per callback (OnControlChange, OnRefresh, ...) with callback latency histograms.
+# Dump the stats with MODE + MARKER SET, or by calling dumpStats() from the script output.
+
+JournalFile = ''
+# File (relative to this script folder) where every incoming control change is appended, e.g. 'midi_journal.txt'.
+# Empty disables the journal. Replay a journal offline with: python -m tools.replay_journal midi_journal.txt
+
+SnapshotFile = 'snapshots.json'
+# File (relative to this script folder) where group mix snapshots are saved.
+# MODE + R stores the current mute/solo/arm/fader state in the slot of that strip, MODE + S recalls it.
+
+GroupMapCacheFile = 'group_map_cache.json'
+# File (relative to this script folder) caching the parsed group map of each mixer layout.
+# On project load, a cached map is reused when the mixer fingerprint matches; PREV + NEXT always rescans.
+
+GroupMapSampleStride = 1
+# The mixer fingerprint is the track count plus the names of every Nth track (1 reads every name).
+# With N > 1, projects whose names only differ on unsampled tracks (e.g. made from one template) share
+# a fingerprint: they load each other's cached group map and overwrite each other's snapshots.
+
+GroupOverrideFile = 'group_overrides.json'
+# Optional file (relative to this script folder) pinning group assignments instead of the (N)/[N] naming:
+# {"groups": {"1": {"members": [1, 2, 3], "masters": [10]}, "2": {"members": [4, 5], "masters": [11]}}}
+
+FadeTime = 2.0
+# Duration in seconds of group fades: MODE + fader fades the group masters to the fader position,
+# MODE + STOP fades every group out. Moving a fader cancels the fade of its group.
+
+RampMaxCallsPerTick = 16
+# Maximum number of mixer volume updates per idle tick shared by all running fades.
+
+GroupBanks = 1
+# Number of banks of 8 groups (1 to 8, up to 64 groups named (1) ... (64) and [1] ... [64]).
+# With more than one bank, MODE + M of strip N shows bank N on the strips and faders.
+
+ScanChunkSize = 16
+# Number of mixer track names read per idle tick by a mixer scan.
+# The previous group map stays active until the scan completes, so the controls keep responding meanwhile.
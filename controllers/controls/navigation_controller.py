@@ -10,13 +10,16 @@ class NavigationController:
         if self.prevTrackPressed and self.nextTrackPressed:
             self.triggerMixerTracksScan()
 
+    def jogTrack(self, steps):
+        self.flApi.globalTransport(102, steps, 2, 15)
+
     def prevTrack(self):
-        self.flApi.globalTransport(102, 1, 2, 15)
+        self.jogTrack(1)
         self.prevTrackPressed = True
         self.checkIfShouldTriggerScan()
 
     def nextTrack(self):
-        self.flApi.globalTransport(102, -1, 2, 15)
+        self.jogTrack(-1)
         self.nextTrackPressed = True
         self.checkIfShouldTriggerScan()
 
@@ -10,17 +10,22 @@ class PatternController:
     def pressModeButton(self):
         self.modeButtonPressed = True
 
+    def useModeCombo(self):
+        self.patternHasMoved = True
+
     def releaseModeButton(self):
         shouldToggleLoopMode = not self.patternHasMoved
         self.modeButtonPressed = False
         self.patternHasMoved = False
         return shouldToggleLoopMode
 
-    def nextPattern(self):
+    def jogPattern(self, steps):
         self.patternHasMoved = True
-        self.flApi.globalTransport(100, 1, 2, 15)
+        self.flApi.globalTransport(100, steps, 2, 15)
+
+    def nextPattern(self):
+        self.jogPattern(1)
 
     def prevPattern(self):
-        self.patternHasMoved = True
-        self.flApi.globalTransport(100, -1, 2, 15)
+        self.jogPattern(-1)
 
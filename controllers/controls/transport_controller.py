@@ -2,19 +2,22 @@ from core.constants import *
 
 
 class TransportController:
-    def __init__(self, lightController, flApi):
+    def __init__(self, lightController, flApi, transportState):
         self.lightController = lightController
         self.flApi = flApi
+        self.transportState = transportState
 
     def play(self):
         self.lightController.updateLight(PLAY_BUTTON, True)
         self.flApi.start()
+        self.transportState.invalidateSongPos()
 
     def stop(self):
         self.lightController.updateLight(PLAY_BUTTON, False)
         self.lightController.updateLight(RECORD_BUTTON, False)
         self.lightController.updateLight(STOP_BUTTON, True)
         self.flApi.stop()
+        self.transportState.invalidateSongPos()
 
     def record(self):
         self.lightController.updateLight(RECORD_BUTTON, True)
@@ -22,17 +25,21 @@ class TransportController:
 
     def rewindStart(self):
         self.flApi.rewind(2)
+        self.transportState.invalidateSongPos()
         self.lightController.updateLight(REWIND_BUTTON, True)
 
     def rewindEnd(self):
         self.flApi.rewind(0)
+        self.transportState.invalidateSongPos()
         self.lightController.updateLight(REWIND_BUTTON, False)
 
     def fastForwardStart(self):
         self.flApi.fastForward(2)
+        self.transportState.invalidateSongPos()
         self.lightController.updateLight(FORWARD_BUTTON, True)
 
     def fastForwardEnd(self):
         self.flApi.fastForward(0)
+        self.transportState.invalidateSongPos()
         self.lightController.updateLight(FORWARD_BUTTON, False)
 
@@ -8,77 +8,170 @@ from core.constants import *
 
 
 class GeneralControlsManager:
-    def __init__(self, hardwareInterface, flApi, triggerMixerTracksScan):
+    def __init__(self, hardwareInterface, flApi, transportState, triggerMixerTracksScan, dumpStats, fadeOutAll,
+                 muteAllGroups, unmuteAllGroups, toggleMetering, autoRepeater):
+        self.flApi = flApi
+        self.transportState = transportState
+        self.triggerMixerTracksScan = triggerMixerTracksScan
+        self.dumpStats = dumpStats
+        self.fadeOutAll = fadeOutAll
+        self.muteAllGroups = muteAllGroups
+        self.unmuteAllGroups = unmuteAllGroups
+        self.toggleMetering = toggleMetering
+        self.autoRepeater = autoRepeater
         self.lightController = ButtonLightController(hardwareInterface, flApi)
-        self.selectionManager = SelectionManager(self.lightController, flApi)
-        self.transportController = TransportController(self.lightController, flApi)
-        self.navigationController = NavigationController(self.lightController, flApi, triggerMixerTracksScan)
-        self.patternController = PatternController(flApi)
-        self.loopModeController = LoopModeController(flApi)
-        self.updateButtonStates(True)
+        # Sub-controllers and dispatch tables are built on the first button press
+        self.pressStartTables = None
+        self.pressEndTable = None
+        self.modifierIndex = 0
+
+    def buildControllers(self):
+        self.selectionManager = SelectionManager(self.lightController, self.flApi, self.transportState)
+        self.transportController = TransportController(self.lightController, self.flApi, self.transportState)
+        self.navigationController = NavigationController(
+            self.lightController, self.flApi, self.triggerMixerTracksScan)
+        self.patternController = PatternController(self.flApi)
+        self.loopModeController = LoopModeController(self.flApi)
+        self.pressStartTables = self.buildPressStartTables()
+        self.pressEndTable = self.buildPressEndTable()
+
+    def buildPressStartTables(self):
+        """One 128-entry action table per modifier combination, indexed by button"""
+        # Held navigation buttons repeat through these, as one multi-step move per idle tick
+        jogTrackBackward = lambda steps: self.navigationController.jogTrack(-steps)
+        jogPatternBackward = lambda steps: self.patternController.jogPattern(-steps)
+        jumpMarkersBackward = lambda steps: self.selectionManager.jumpMarkers(-steps)
+        defaultActions = {
+            PLAY_BUTTON: self.transportController.play,
+            STOP_BUTTON: self.transportController.stop,
+            RECORD_BUTTON: self.transportController.record,
+            MODE_BUTTON: self.patternController.pressModeButton,
+            PREV_TRACK_BUTTON: self.makeRepeatingAction(
+                PREV_TRACK_BUTTON, self.navigationController.prevTrack, self.navigationController.jogTrack),
+            NEXT_TRACK_BUTTON: self.makeRepeatingAction(
+                NEXT_TRACK_BUTTON, self.navigationController.nextTrack, jogTrackBackward),
+            REWIND_BUTTON: self.transportController.rewindStart,
+            FORWARD_BUTTON: self.transportController.fastForwardStart,
+            MARKER_PREV_BUTTON: self.makeRepeatingAction(
+                MARKER_PREV_BUTTON, self.selectionManager.movePrevMarker, jumpMarkersBackward),
+            MARKER_NEXT_BUTTON: self.makeRepeatingAction(
+                MARKER_NEXT_BUTTON, self.selectionManager.moveNextMarker, self.selectionManager.jumpMarkers),
+            MARKER_SET_BUTTON: self.selectionManager.startNewSelection,
+        }
+        selectionActions = {
+            **defaultActions,
+            PREV_TRACK_BUTTON: self.selectionManager.moveSelectionForward,
+            NEXT_TRACK_BUTTON: self.selectionManager.moveSelectionBackward,
+            FORWARD_BUTTON: self.increaseSelectionAccuracy,
+        }
+        modeActions = {
+            PREV_TRACK_BUTTON: self.makeRepeatingAction(
+                PREV_TRACK_BUTTON, self.patternController.nextPattern, self.patternController.jogPattern),
+            NEXT_TRACK_BUTTON: self.makeRepeatingAction(
+                NEXT_TRACK_BUTTON, self.patternController.prevPattern, jogPatternBackward),
+            MARKER_SET_BUTTON: self.dumpStatsCombo,
+            STOP_BUTTON: self.fadeOutAllCombo,
+            MARKER_PREV_BUTTON: self.muteAllGroupsCombo,
+            MARKER_NEXT_BUTTON: self.unmuteAllGroupsCombo,
+            RECORD_BUTTON: self.toggleMeteringCombo,
+        }
+
+        tables = [None] * 4
+        tables[0] = self.buildTable(defaultActions, True)
+        tables[SELECTION_MODIFIER] = self.buildTable(selectionActions, True)
+        tables[MODE_MODIFIER] = self.buildTable({**defaultActions, **modeActions}, True)
+        tables[MODE_MODIFIER | SELECTION_MODIFIER] = self.buildTable({**selectionActions, **modeActions}, True)
+        return tables
+
+    def buildPressEndTable(self):
+        actions = {
+            PREV_TRACK_BUTTON: self.navigationController.releasePrevTrack,
+            NEXT_TRACK_BUTTON: self.navigationController.releaseNextTrack,
+            MARKER_PREV_BUTTON: self.selectionManager.releasePrevMarker,
+            MARKER_NEXT_BUTTON: self.selectionManager.releaseNextMarker,
+            MARKER_SET_BUTTON: self.selectionManager.endSelection,
+            REWIND_BUTTON: self.transportController.rewindEnd,
+            FORWARD_BUTTON: self.endFastForward,
+            MODE_BUTTON: self.releaseModeButton,
+        }
+        for button in TOGGLE_MODE_BUTTONS:
+            actions.setdefault(button, self.ignorePress)
+        return self.buildTable(actions, False)
+
+    def buildTable(self, actions, turnOnUnmapped):
+        table = []
+        for button in range(128):
+            action = actions.get(button)
+            if action is None:
+                action = self.makeLightAction(button, turnOnUnmapped)
+            table.append(action)
+        return table
+
+    def makeRepeatingAction(self, button, pressAction, stepAction):
+        """Run pressAction once, then stepAction(steps) while the button is held"""
+        def pressWithRepeat():
+            pressAction()
+            self.autoRepeater.start(button, stepAction)
+        return pressWithRepeat
+
+    def makeLightAction(self, button, turnOn):
+        return lambda: self.lightController.updateLight(button, turnOn)
+
+    def ignorePress(self):
+        pass
+
+    def updateModifiers(self):
+        self.modifierIndex = (
+            (MODE_MODIFIER if self.patternController.isModePressed() else 0)
+            | (SELECTION_MODIFIER if self.selectionManager.isActive() else 0))
 
     def updateButtonStates(self, init=False):
         self.lightController.updateTransportStates(init)
 
     def onPressStart(self, button):
-        if button == PLAY_BUTTON:
-            self.transportController.play()
-        elif button == STOP_BUTTON:
-            self.transportController.stop()
-        elif button == RECORD_BUTTON:
-            self.transportController.record()
-        elif button == MODE_BUTTON:
-            self.patternController.pressModeButton()
-        elif button == PREV_TRACK_BUTTON:
-            if self.patternController.isModePressed():
-                self.patternController.nextPattern()
-            elif self.selectionManager.isActive():
-                self.selectionManager.moveSelectionForward()
-            else:
-                self.navigationController.prevTrack()
-        elif button == NEXT_TRACK_BUTTON:
-            if self.patternController.isModePressed():
-                self.patternController.prevPattern()
-            elif self.selectionManager.isActive():
-                self.selectionManager.moveSelectionBackward()
-            else:
-                self.navigationController.nextTrack()
-        elif button == REWIND_BUTTON:
-            self.transportController.rewindStart()
-        elif button == FORWARD_BUTTON:
-            if self.selectionManager.isActive():
-                self.selectionManager.setAccuracy(True)
-            else:
-                self.transportController.fastForwardStart()
-            self.lightController.updateLight(button, True)
-        elif button == MARKER_PREV_BUTTON:
-            self.selectionManager.movePrevMarker()
-        elif button == MARKER_NEXT_BUTTON:
-            self.selectionManager.moveNextMarker()
-        elif button == MARKER_SET_BUTTON:
-            self.selectionManager.startNewSelection()
-        else:
-            self.lightController.updateLight(button, True)
+        if self.pressStartTables is None:
+            self.buildControllers()
+        self.pressStartTables[self.modifierIndex][button]()
+        self.updateModifiers()
 
     def onPressEnd(self, button):
-        if button == PREV_TRACK_BUTTON:
-            self.navigationController.releasePrevTrack()
-        elif button == NEXT_TRACK_BUTTON:
-            self.navigationController.releaseNextTrack()
-        elif button == MARKER_PREV_BUTTON:
-            self.selectionManager.releasePrevMarker()
-        elif button == MARKER_NEXT_BUTTON:
-            self.selectionManager.releaseNextMarker()
-        elif button == MARKER_SET_BUTTON:
-            self.selectionManager.endSelection()
-        elif button == REWIND_BUTTON:
-            self.transportController.rewindEnd()
-        elif button == FORWARD_BUTTON:
-            self.transportController.fastForwardEnd()
-            self.selectionManager.setAccuracy(False)
-        elif button == MODE_BUTTON:
-            if self.patternController.releaseModeButton():
-                self.loopModeController.toggleLoopMode()
-        elif button not in TOGGLE_MODE_BUTTONS:
-            self.lightController.updateLight(button, False)
+        if self.pressEndTable is None:
+            self.buildControllers()
+        self.autoRepeater.stop(button)
+        self.pressEndTable[button]()
+        self.updateModifiers()
+
+    def increaseSelectionAccuracy(self):
+        self.selectionManager.setAccuracy(True)
+        self.lightController.updateLight(FORWARD_BUTTON, True)
+
+    def endFastForward(self):
+        self.transportController.fastForwardEnd()
+        self.selectionManager.setAccuracy(False)
+
+    def useModeCombo(self):
+        self.patternController.useModeCombo()
+
+    def dumpStatsCombo(self):
+        self.useModeCombo()
+        self.dumpStats()
+
+    def fadeOutAllCombo(self):
+        self.useModeCombo()
+        self.fadeOutAll()
+
+    def muteAllGroupsCombo(self):
+        self.useModeCombo()
+        self.muteAllGroups()
+
+    def unmuteAllGroupsCombo(self):
+        self.useModeCombo()
+        self.unmuteAllGroups()
+
+    def toggleMeteringCombo(self):
+        self.useModeCombo()
+        self.toggleMetering()
 
+    def releaseModeButton(self):
+        if self.patternController.releaseModeButton():
+            self.loopModeController.toggleLoopMode()
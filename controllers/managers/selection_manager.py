@@ -2,64 +2,64 @@ from core.constants import *
 
 
 class SelectionManager:
-    def __init__(self, lightController, flApi):
+    def __init__(self, lightController, flApi, transportState):
         self.lightController = lightController
         self.flApi = flApi
+        self.transportState = transportState
         self.prevSelectionStart = None
         self.prevSelectionEnd = None
         self.prevMarkerPressed = False
         self.nextMarkerPressed = False
         self.newSelectionStart = None
         self.wasPlayingWhenSelectionStarted = False
-        self.selectionStep = FOUR_BARS_IN_TICKS
+        self.selectionBars = SELECTION_COARSE_BARS
         self.hasSelectionMoved = False
 
     def isActive(self):
         return self.newSelectionStart is not None
 
     def setAccuracy(self, useHighAccuracy):
-        self.selectionStep = ONE_BAR_IN_TICKS if useHighAccuracy else FOUR_BARS_IN_TICKS
+        self.selectionBars = 1 if useHighAccuracy else SELECTION_COARSE_BARS
+
+    def getSelectionStep(self):
+        return self.selectionBars * self.transportState.getTicksPerBar()
 
     def checkIfShouldToggleSelection(self):
         if self.prevMarkerPressed and self.nextMarkerPressed:
-            currentStart = self.flApi.selectionStart()
-            currentEnd = self.flApi.selectionEnd()
-            
+            currentStart, currentEnd = self.transportState.getSelection()
+
             if currentEnd == -1 and self.prevSelectionStart is not None and self.prevSelectionEnd is not None:
-                self.flApi.liveSelection(self.prevSelectionStart, False)
-                self.flApi.liveSelection(self.prevSelectionEnd, True)
+                self.transportState.setSelection(self.prevSelectionStart, self.prevSelectionEnd)
             else:
                 self.prevSelectionStart = currentStart
                 self.prevSelectionEnd = currentEnd
-                self.flApi.liveSelection(0, False)
-                self.flApi.liveSelection(0, True)
-            self.flApi.setSongPos(self.prevSelectionStart, 2)
+                self.transportState.setSelection(0, 0)
+            self.transportState.setSongPos(self.prevSelectionStart)
 
     def startNewSelection(self):
         self.wasPlayingWhenSelectionStarted = self.flApi.isPlaying()
         if self.wasPlayingWhenSelectionStarted:
             self.flApi.start()
+            self.transportState.invalidateSongPos()
+
+        self.prevSelectionStart, self.prevSelectionEnd = self.transportState.getSelection()
+        self.transportState.setSelection(0, 0)
 
-        self.prevSelectionStart = self.flApi.selectionStart()
-        self.prevSelectionEnd = self.flApi.selectionEnd()
-        self.flApi.liveSelection(0, False)
-        self.flApi.liveSelection(0, True)
-        
-        currentPos = self.flApi.getSongPos(2)
-        currentBar = round(currentPos / self.selectionStep)
-        targetPos = currentBar * self.selectionStep
-        self.flApi.setSongPos(targetPos, 2)
-        
-        self.newSelectionStart = self.flApi.currentTime(0)
+        selectionStep = self.getSelectionStep()
+        currentBar = round(self.transportState.getSongPos() / selectionStep)
+        targetPos = currentBar * selectionStep
+        self.transportState.setSongPos(targetPos)
+
+        self.newSelectionStart = targetPos
 
     def endSelection(self):
         if self.newSelectionStart is not None:
             if not self.hasSelectionMoved:
                 newEnd = self.flApi.currentTime(0)
-                self.flApi.liveSelection(self.newSelectionStart, False)
-                self.flApi.liveSelection(newEnd, True)
+                self.transportState.setSelection(self.newSelectionStart, newEnd)
             if not self.flApi.isPlaying() and self.wasPlayingWhenSelectionStarted:
                 self.flApi.start()
+                self.transportState.invalidateSongPos()
         self.newSelectionStart = None
         self.hasSelectionMoved = False
 
@@ -69,9 +69,8 @@ class SelectionManager:
             offset = selectionLength * direction
             newStart = max(0, self.prevSelectionStart + offset)
             newEnd = max(0, self.prevSelectionEnd + offset)
-            self.flApi.liveSelection(newStart, False)
-            self.flApi.liveSelection(newEnd, True)
-            self.flApi.setSongPos(newStart, 2)
+            self.transportState.setSelection(newStart, newEnd)
+            self.transportState.setSongPos(newStart)
             self.prevSelectionStart = newStart
             self.prevSelectionEnd = newEnd
             self.hasSelectionMoved = True
@@ -82,21 +81,20 @@ class SelectionManager:
     def moveSelectionBackward(self):
         self.moveSelection(-1)
 
+    def jumpMarkers(self, steps):
+        """Move the song position by `steps` selection steps (bars) in one setSongPos"""
+        selectionStep = self.getSelectionStep()
+        currentBar = self.transportState.getSongPos() // selectionStep
+        targetBar = max(0, currentBar + steps)
+        self.transportState.setSongPos(targetBar * selectionStep)
+
     def movePrevMarker(self):
-        currentPos = self.flApi.getSongPos(2)
-        currentBar = currentPos // self.selectionStep
-        targetBar = max(0, currentBar - 1)
-        targetPos = targetBar * self.selectionStep
-        self.flApi.setSongPos(targetPos, 2)
+        self.jumpMarkers(-1)
         self.prevMarkerPressed = True
         self.checkIfShouldToggleSelection()
 
     def moveNextMarker(self):
-        currentPos = self.flApi.getSongPos(2)
-        currentBar = currentPos // self.selectionStep
-        targetBar = currentBar + 1
-        targetPos = targetBar * self.selectionStep
-        self.flApi.setSongPos(targetPos, 2)
+        self.jumpMarkers(1)
         self.nextMarkerPressed = True
         self.checkIfShouldToggleSelection()
 
@@ -0,0 +1,40 @@
+from core.constants import *
+
+
+class SnapshotManager:
+    """Stores and recalls group mix states (mute/solo/arm per group and master fader values)"""
+
+    def __init__(self, tracksManager, snapshotStore):
+        self.tracksManager = tracksManager
+        self.snapshotStore = snapshotStore
+        self.snapshots = {}
+        self.loadedFingerprint = None
+
+    def getSnapshots(self):
+        fingerprint = self.tracksManager.mixerFingerprint
+        if fingerprint != self.loadedFingerprint:
+            self.snapshots = self.snapshotStore.load(fingerprint) if fingerprint is not None else {}
+            self.loadedFingerprint = fingerprint
+        return self.snapshots
+
+    def followFingerprintRename(self, oldFingerprint, newFingerprint):
+        """A renamed sampled track changes the fingerprint, the snapshots stay with the mixer"""
+        self.snapshotStore.move(oldFingerprint, newFingerprint)
+        if self.loadedFingerprint == oldFingerprint:
+            self.loadedFingerprint = newFingerprint
+
+    def storeSnapshot(self, button):
+        slot = BUTTON_STRIP_INDEX[button]
+        snapshots = self.getSnapshots()
+        snapshots[slot] = self.tracksManager.captureGroupState()
+        if self.loadedFingerprint is not None:
+            self.snapshotStore.save(self.loadedFingerprint, snapshots)
+        print(f"Snapshot {slot + 1} stored")
+
+    def recallSnapshot(self, button):
+        slot = BUTTON_STRIP_INDEX[button]
+        snapshot = self.getSnapshots().get(slot)
+        if snapshot is None:
+            print(f"Snapshot {slot + 1} is empty")
+            return
+        self.tracksManager.applyGroupState(snapshot)
@@ -1,186 +1,497 @@
-from time import sleep
+from bisect import insort
 from core.constants import *
+from core.fader_curves import FaderCurves
+from core.group_meter import GroupMeter
+from core.group_state import GroupState
+from core.mixer_scanner import MixerScanner
+from core.volume_ramps import VolumeRampEngine
 
 
 class TracksManager:
-    def __init__(self, hardwareInterface, flApi):
-        self.hardwareInterface = hardwareInterface
+    def __init__(self, units, flApi, scheduler, mixerState, groupMapCache):
+        # ControlUnit of every connected nanoKONTROL2, each showing one bank of groups
+        self.units = units
         self.flApi = flApi
-        self.groupSoloed = -1
-        self.mutedGroups = []
-        self.armedGroups = []
+        self.scheduler = scheduler
+        self.mixerState = mixerState
+        self.groupMapCache = groupMapCache
+        self.pendingSoloStep = None
+        # Muted/armed/soloed groups, the S/M/R LEDs of each unit are derived from it
+        self.state = GroupState()
         self.trackGroups = []
         self.trackGroupMasters = []
-        self.hardwareInterface.updateTracksButtons(False)
-
-    @staticmethod
-    def getGroupIndexFromButton(button):
-        return (button - TRACKS_FIRST_BUTTON) // 3
-
-    @staticmethod
-    def getSoloButton(groupIndex):
-        return TRACKS_FIRST_BUTTON + groupIndex * 3
-
-    @staticmethod
-    def getMuteButton(groupIndex):
-        return TRACKS_FIRST_BUTTON + groupIndex * 3 + 1
+        self.mixerFingerprint = None
+        # trackIndex -> (groups, masterGroups) of every grouped track, reverse of trackGroups/trackGroupMasters
+        self.trackMembership = {}
+        # Tracks reported dirty by FL Studio whose name is re-read on the next HW_Dirty_Names refresh
+        self.renameCandidates = set()
+        # Called with (oldFingerprint, newFingerprint) when renames change the fingerprint of the loaded mixer
+        self.fingerprintRenameListeners = []
+        # groupIndex -> latest fader value (0-127) not yet sent to the mixer
+        self.pendingFaderValues = {}
+        self.appliedFaderValues = {}
+        self.movingFaders = set()
+        self.faderCurves = FaderCurves()
+        self.scanner = MixerScanner(flApi)
+        # Running MixerScanJob, see startMixerScan()
+        self.scanJob = None
+        self.volumeRamps = VolumeRampEngine(scheduler, self.applyFaderValue, self.getMasterCount)
+        self.meter = GroupMeter(flApi, scheduler, self.showGroupLights)
+
+    def setState(self, state):
+        self.state = state
+        self.showGroupLights()
+
+    def showGroupLights(self):
+        """Hand the 24 LEDs of each unit's bank to its HardwareInterface, which only sends the changed ones"""
+        for unit in self.units:
+            unit.hardwareInterface.updateTrackLights(self.getStripLights(unit.bank))
+
+    def getStripLights(self, bank):
+        return self.state.getStripLights(bank, self.meter.litMask if self.meter.isEnabled else None)
+
+    def selectBank(self, unit, bank):
+        if bank >= NB_BANKS or bank == unit.bank:
+            return
+        unit.setBank(bank)
+        unit.hardwareInterface.updateTrackLights(self.getStripLights(bank))
+        self.updateMeteredGroups()
+        print(f"Unit {unit.index + 1}, group bank {bank + 1}: groups {bank * NB_STRIPS + 1}-{(bank + 1) * NB_STRIPS}")
 
-    @staticmethod
-    def getArmButton(groupIndex):
-        return TRACKS_FIRST_BUTTON + groupIndex * 3 + 2
+    def resetButtonLights(self):
+        self.showGroupLights()
 
-    def validateGroupIndex(self, button):
-        groupIndex = self.getGroupIndexFromButton(button)
+    def validateGroupIndex(self, groupIndex):
         if groupIndex < 0 or groupIndex >= len(self.trackGroups):
             return None
         return groupIndex
 
-    def findTracksOfGroup(self, groupIndex, onlyMasters=False):
-        trackGroup = []
-        textToFindGroupTrack = f"({groupIndex})"
-        textToFindGroupMasterTrack = f"[{groupIndex}]"
+    def loadGroupMap(self):
+        """Project load: use the override file or the cached map of this mixer layout before scanning"""
+        if self.applyGroupOverride():
+            return
 
-        for trackIndex in range(0, FL_TOTAL_NB_TRACKS + 1):
-            trackName = self.flApi.getTrackName(trackIndex)
-            if (not onlyMasters and textToFindGroupTrack in trackName) or textToFindGroupMasterTrack in trackName:
-                trackGroup.append(trackIndex)
+        fingerprint = self.scanner.sampleFingerprint()
+        cachedGroupMap = self.groupMapCache.get(fingerprint)
+        if cachedGroupMap is None:
+            self.startMixerScan(True)
+            return
 
-        return trackGroup
+        self.setGroupMap(cachedGroupMap[0], cachedGroupMap[1], fingerprint)
+        print(f"Group map: cache hit, {self.scanner.getReport()}")
 
     def scanMixerTrackNames(self):
-        self.trackGroups = []
-        self.trackGroupMasters = []
-
-        for index in range(1, 9):
-            self.trackGroups.append(self.findTracksOfGroup(index))
-            self.trackGroupMasters.append(
-                self.findTracksOfGroup(index, True))
-
-        for index in range(0, 2):
-            self.hardwareInterface.updateTracksButtons(True)
-            sleep(0.1)
-            self.hardwareInterface.updateTracksButtons(False)
-            sleep(0.1)
-
-    def armTrack(self, button):
-        groupIndex = self.validateGroupIndex(button)
-        if groupIndex is None:
+        if not self.applyGroupOverride():
+            self.startMixerScan()
+
+    def applyGroupOverride(self):
+        override = self.groupMapCache.loadOverride()
+        if override is None:
+            return False
+        self.setGroupMap(override[0], override[1], GROUP_OVERRIDE_FINGERPRINT)
+        print("Group map: loaded from the override file")
+        return True
+
+    def startMixerScan(self, isAfterSampling=False):
+        """The current group map stays live until the scan job has read the whole mixer"""
+        self.scanJob = self.scanner.startScan(isAfterSampling)
+        self.scheduler.schedule(0, self.continueMixerScan, MIXER_SCAN_TASK)
+
+    def continueMixerScan(self):
+        if not self.scanJob.step(SCAN_CHUNK_SIZE):
+            self.scheduler.schedule(0, self.continueMixerScan, MIXER_SCAN_TASK)
             return
 
-        armButton = self.getArmButton(groupIndex)
-        
-        if groupIndex in self.armedGroups:
-            self.armedGroups.remove(groupIndex)
-            self.hardwareInterface.updateButtonLight(armButton, False)
-
-            for track in self.trackGroupMasters[groupIndex]:
-                if self.flApi.isTrackArmed(track) != 0:
-                    self.flApi.armTrack(track)
+        job = self.scanJob
+        trackGroups, trackGroupMasters = job.getGroupMap()
+        fingerprint = self.scanner.finishScan(job)
+        self.groupMapCache.put(fingerprint, trackGroups, trackGroupMasters)
+        self.setGroupMap(trackGroups, trackGroupMasters, fingerprint)
+        print(self.scanner.getReport())
+
+    def setGroupMap(self, trackGroups, trackGroupMasters, fingerprint):
+        self.scanJob = None
+        self.scheduler.cancel(MIXER_SCAN_TASK)
+        self.trackGroups = trackGroups
+        self.trackGroupMasters = trackGroupMasters
+        self.mixerFingerprint = fingerprint
+        self.buildTrackMembership()
+        # Refilled lazily, reading every grouped track here would stall the tick that completes the scan
+        self.mixerState.invalidate(-1)
+        self.updateMeteredGroups()
+        self.flashTracksButtons()
+
+    def buildTrackMembership(self):
+        self.trackMembership = {}
+        self.renameCandidates = set()
+        for groupIndex, trackGroup in enumerate(self.trackGroups):
+            for track in trackGroup:
+                self.trackMembership.setdefault(track, (set(), set()))[0].add(groupIndex)
+        for groupIndex, masterTracks in enumerate(self.trackGroupMasters):
+            for track in masterTracks:
+                self.trackMembership.setdefault(track, (set(), set()))[1].add(groupIndex)
+
+    def queueRenameCheck(self, trackIndex):
+        if trackIndex < 0 or trackIndex > FL_TOTAL_NB_TRACKS:
+            return
+        # A running scan reads the track itself, the group map it replaces is not patched
+        if self.scanJob is not None:
+            self.scanJob.markDirty(trackIndex)
+            return
+        # The override file pins groups regardless of names, a full change (-1) is left to PREV + NEXT
+        if self.mixerFingerprint in (None, GROUP_OVERRIDE_FINGERPRINT):
+            return
+        # Volume, pan and automation changes also dirty the track, its name is only read once FL reports a rename
+        self.renameCandidates.add(trackIndex)
+
+    def checkRenamedTracks(self):
+        """HW_Dirty_Names refresh: re-parse the name of each dirty track and patch the group lists it joined or left"""
+        fingerprint = self.mixerFingerprint
+        isGroupMapChanged = False
+        for track in sorted(self.renameCandidates):
+            trackName = self.flApi.getTrackName(track)
+            fingerprint = self.scanner.updateSampledName(track, trackName)
+            groups, masterGroups = MixerScanner.parseTrackName(trackName)
+            if self.patchTrackMembership(track, groups, masterGroups):
+                isGroupMapChanged = True
+                self.updateMeteredGroups()
+                print(f"Group map: track {track} '{trackName}' updated")
+        self.renameCandidates = set()
+
+        if isGroupMapChanged or fingerprint != self.mixerFingerprint:
+            oldFingerprint = self.mixerFingerprint
+            self.mixerFingerprint = fingerprint
+            self.groupMapCache.put(fingerprint, self.trackGroups, self.trackGroupMasters)
+            if fingerprint != oldFingerprint:
+                for listener in self.fingerprintRenameListeners:
+                    listener(oldFingerprint, fingerprint)
+
+    def patchTrackMembership(self, track, groups, masterGroups):
+        oldGroups, oldMasterGroups = self.trackMembership.get(track, (set(), set()))
+        if groups == oldGroups and masterGroups == oldMasterGroups:
+            return False
+
+        for groupIndex in oldGroups - groups:
+            self.trackGroups[groupIndex].remove(track)
+        for groupIndex in groups - oldGroups:
+            insort(self.trackGroups[groupIndex], track)
+        for groupIndex in oldMasterGroups - masterGroups:
+            self.trackGroupMasters[groupIndex].remove(track)
+        for groupIndex in masterGroups - oldMasterGroups:
+            insort(self.trackGroupMasters[groupIndex], track)
+
+        if groups:
+            self.trackMembership[track] = (groups, masterGroups)
         else:
-            self.armedGroups.append(groupIndex)
-            self.hardwareInterface.updateButtonLight(armButton, True)
-
-            for track in self.trackGroupMasters[groupIndex]:
-                if self.flApi.isTrackArmed(track) == 0:
-                    self.flApi.armTrack(track)
-
-    def checkIfOnlyOneGroupUnmuted(self):
-        if len(self.mutedGroups) != len(self.trackGroups) - 1:
+            self.trackMembership.pop(track, None)
+        return True
+
+    def toggleMetering(self):
+        """MODE + RECORD: show group master peaks on the METER_ROLE LEDs instead of the group state"""
+        self.meter.setEnabled(not self.meter.isEnabled)
+        self.updateMeteredGroups()
+        self.showGroupLights()
+        print(f"Metering {'on' if self.meter.isEnabled else 'off'}")
+
+    def updateMeteredGroups(self):
+        """Meter the masters of the groups shown on a unit"""
+        if not self.meter.isEnabled:
+            return
+        groupTracks = {}
+        for unit in self.units:
+            for groupIndex in range(unit.groupOffset, min(unit.groupOffset + NB_STRIPS, len(self.trackGroupMasters))):
+                if self.trackGroupMasters[groupIndex]:
+                    groupTracks[groupIndex] = list(self.trackGroupMasters[groupIndex])
+        self.meter.setGroups(groupTracks)
+
+    def flashTracksButtons(self):
+        turnOn = lambda: self.updateUnitsTracksButtons(True)
+        turnOff = lambda: self.updateUnitsTracksButtons(False)
+        # The last frame shows the group LEDs again
+        frames = [turnOn, turnOff] * SCAN_FLASH_COUNT
+        self.scheduler.scheduleSequence(SCAN_FLASH_INTERVAL, frames[:-1] + [self.showGroupLights], SCAN_FLASH_TASK)
+
+    def updateUnitsTracksButtons(self, turnOn):
+        for unit in self.units:
+            unit.hardwareInterface.updateTracksButtons(turnOn)
+
+    def applyGroupCommands(self, muteTargets=None, armTargets=None, writeTracks=True):
+        """
+        Batch of group operations as groupIndex -> target state, e.g. muteTargets={1: True, 2: True, 0: False}.
+        The operations are merged into one target per track (a track shared by several groups stays muted
+        while any of them is muted), each affected track is written once if its cached state differs,
+        then the LEDs of the changed groups are sent.
+        writeTracks=False only updates the group model and LEDs, for changes FL Studio already made.
+        """
+        muteTargets = muteTargets or {}
+        armTargets = armTargets or {}
+        nbGroups = len(self.trackGroups)
+        muteMask = unmuteMask = armMask = disarmMask = 0
+        muteTracks = set()
+        armTracks = set()
+
+        for groupIndex, mute in muteTargets.items():
+            if groupIndex >= nbGroups:
+                continue
+            if mute:
+                muteMask |= 1 << groupIndex
+            else:
+                unmuteMask |= 1 << groupIndex
+            muteTracks.update(self.trackGroups[groupIndex])
+
+        for groupIndex, arm in armTargets.items():
+            if groupIndex >= nbGroups:
+                continue
+            if arm:
+                armMask |= 1 << groupIndex
+            else:
+                disarmMask |= 1 << groupIndex
+            armTracks.update(self.trackGroupMasters[groupIndex])
+
+        state = self.state.withMuted(muteMask, unmuteMask).withArmed(armMask, disarmMask)
+        if writeTracks:
+            for track in sorted(muteTracks):
+                self.mixerState.setMuted(track, state.isAnyMuted(self.trackMembership[track][0]))
+            for track in sorted(armTracks):
+                self.mixerState.setArmed(track, state.isAnyArmed(self.trackMembership[track][1]))
+        self.setState(state)
+
+    def armTrack(self, groupIndex):
+        groupIndex = self.validateGroupIndex(groupIndex)
+        if groupIndex is None:
             return
+        self.applyGroupCommands(armTargets={groupIndex: not self.state.isArmed(groupIndex)})
 
-        for index in range(len(self.trackGroups)):
-            if index not in self.mutedGroups:
-                self.groupSoloed = index
-                self.hardwareInterface.updateButtonLight(self.getSoloButton(index), True)
-                break
+    def checkIfOnlyOneGroupUnmuted(self):
+        state = self.state.withSingleUnmutedAsSolo(len(self.trackGroups))
+        if state is not self.state:
+            self.setState(state)
 
-    def muteGroup(self, button):
-        groupIndex = self.validateGroupIndex(button)
+    def muteGroup(self, groupIndex):
+        self.resumePendingSoloStep()
+        groupIndex = self.validateGroupIndex(groupIndex)
         if groupIndex is None:
             return
 
-        if self.groupSoloed > -1:
-            self.hardwareInterface.updateButtonLight(self.getSoloButton(self.groupSoloed), False)
-            self.groupSoloed = -1
-
-        muteButton = self.getMuteButton(groupIndex)
-        
-        if groupIndex in self.mutedGroups:
-            self.mutedGroups.remove(groupIndex)
-            mute = False
-        else:
-            self.mutedGroups.append(groupIndex)
-            mute = True
+        # The LEDs follow with the batch
+        self.state = self.state.withoutSolo()
+        self.applyGroupCommands(muteTargets={groupIndex: not self.state.isMuted(groupIndex)})
+        self.checkIfOnlyOneGroupUnmuted()
 
-        self.hardwareInterface.updateButtonLight(muteButton, not mute)
+    def muteAllGroups(self):
+        self.setAllGroupsMuted(True)
 
-        for track in self.trackGroups[groupIndex]:
-            if mute and self.flApi.isTrackMuted(track) == 0:
-                self.flApi.muteTrack(track)
-            elif not mute and self.flApi.isTrackMuted(track) != 0:
-                self.flApi.muteTrack(track)
+    def unmuteAllGroups(self):
+        self.setAllGroupsMuted(False)
 
+    def setAllGroupsMuted(self, mute):
+        """MODE + MARKER PREV / NEXT: mute or unmute every group in one pass over the grouped tracks"""
+        self.resumePendingSoloStep()
+        self.state = self.state.withoutSolo()
+        self.applyGroupCommands(muteTargets={index: mute for index in range(len(self.trackGroups))})
         self.checkIfOnlyOneGroupUnmuted()
 
-    def muteAllTracksExcept(self, exceptionGroupIndex):
-        self.hardwareInterface.updateButtonLight(self.getMuteButton(exceptionGroupIndex), True)
-        self.mutedGroups = []
-        for index in range(len(self.trackGroups)):
-            if index != exceptionGroupIndex:
-                self.hardwareInterface.updateButtonLight(self.getMuteButton(index), False)
-                self.mutedGroups.append(index)
-
-    def clearAllMuteButtonLights(self):
-        for index in range(len(self.trackGroups)):
-            self.hardwareInterface.updateButtonLight(self.getMuteButton(index), True)
-        self.mutedGroups = []
-
-    def soloGroup(self, button):
-        groupIndex = self.validateGroupIndex(button)
+    def syncGroupStates(self):
+        """
+        Follow mute/arm changes made in FL Studio. Only groups whose tracks contradict the group model change:
+        a muted group with an unmuted track is unmuted, an unmuted group is muted when all its tracks are
+        and one of them is not muted by another group (same for arm with the masters).
+        """
+        if self.state.soloed >= 0 or self.pendingSoloStep is not None:
+            return
+
+        muteTargets = {}
+        for groupIndex, trackGroup in enumerate(self.trackGroups):
+            if len(trackGroup) == 0:
+                continue
+            if self.state.isMuted(groupIndex):
+                if not all(self.mixerState.isMuted(track) for track in trackGroup):
+                    muteTargets[groupIndex] = False
+            elif all(self.mixerState.isMuted(track) for track in trackGroup) and not all(
+                    self.state.isAnyMuted(self.trackMembership[track][0]) for track in trackGroup):
+                muteTargets[groupIndex] = True
+        armTargets = {}
+        for groupIndex, masterTracks in enumerate(self.trackGroupMasters):
+            if len(masterTracks) == 0:
+                continue
+            if self.state.isArmed(groupIndex):
+                if not all(self.mixerState.isArmed(track) for track in masterTracks):
+                    armTargets[groupIndex] = False
+            elif all(self.mixerState.isArmed(track) for track in masterTracks) and not all(
+                    self.state.isAnyArmed(self.trackMembership[track][1]) for track in masterTracks):
+                armTargets[groupIndex] = True
+        if muteTargets or armTargets:
+            self.applyGroupCommands(muteTargets, armTargets, False)
+
+    def soloGroup(self, groupIndex):
+        self.resumePendingSoloStep()
+        groupIndex = self.validateGroupIndex(groupIndex)
         if groupIndex is None or len(self.trackGroups[groupIndex]) == 0:
             return
+        self.toggleGroupSolo(groupIndex)
 
+    def toggleGroupSolo(self, groupIndex):
         firstGroupTrack = self.trackGroups[groupIndex][0]
 
-        if self.groupSoloed == groupIndex:
-            self.hardwareInterface.updateButtonLight(button, False)
-            self.clearAllMuteButtonLights()
-
-            self.flApi.soloTrack(firstGroupTrack)
+        if self.state.soloed == groupIndex:
+            self.setState(self.state.withUnsolo())
+            self.mixerState.toggleSolo(firstGroupTrack)
+            self.deferSoloStep(lambda: self.settleUnsolo(firstGroupTrack))
+            return
 
-            sleep(SLEEP_TIME)
-            if self.flApi.isTrackSolo(firstGroupTrack) != 0:
-                self.flApi.soloTrack(firstGroupTrack)
+        # FL Studio's solo mutes the other tracks itself
+        self.setState(self.state.withSolo(groupIndex, len(self.trackGroups)))
+        if not self.mixerState.isSoloed(firstGroupTrack):
+            self.mixerState.toggleSolo(firstGroupTrack)
 
-            self.groupSoloed = -1
+        otherGroupTracks = self.trackGroups[groupIndex][1:]
+        if len(otherGroupTracks) == 0:
             return
+        self.deferSoloStep(lambda: self.unmuteTracks(otherGroupTracks))
 
-        if self.groupSoloed >= 0:
-            self.hardwareInterface.updateButtonLight(self.getSoloButton(self.groupSoloed), False)
+    def isSoloInMixer(self, groupIndex):
+        """The solo LED is also shown for the only unmuted group, which may be empty or not soloed in FL Studio"""
+        trackGroup = self.trackGroups[groupIndex] if groupIndex < len(self.trackGroups) else []
+        return len(trackGroup) > 0 and self.mixerState.isSoloed(trackGroup[0])
 
-        self.hardwareInterface.updateButtonLight(button, True)
-        self.muteAllTracksExcept(groupIndex)
+    def settleUnsolo(self, track):
+        if self.mixerState.isSoloed(track):
+            self.mixerState.toggleSolo(track)
 
-        self.groupSoloed = groupIndex
-        if self.flApi.isTrackSolo(firstGroupTrack) == 0:
-            self.flApi.soloTrack(firstGroupTrack)
+    def unmuteTracks(self, tracks):
+        for track in tracks:
+            self.mixerState.setMuted(track, False)
 
-        groupLength = len(self.trackGroups[groupIndex])
-        if groupLength <= 1:
+    def deferSoloStep(self, step):
+        """FL applies a solo asynchronously: finish on the next idle tick or mixer-dirty callback"""
+        self.pendingSoloStep = step
+        self.scheduler.schedule(0, self.resumePendingSoloStep, SOLO_SETTLE_TASK)
+
+    def resumePendingSoloStep(self):
+        step = self.pendingSoloStep
+        if step is None:
+            return
+        self.pendingSoloStep = None
+        self.scheduler.cancel(SOLO_SETTLE_TASK)
+        step()
+
+    def onMixerTrackDirty(self, trackIndex):
+        if self.mixerState.onTrackDirty(trackIndex):
+            self.forgetFaderValues(trackIndex)
+            self.queueRenameCheck(trackIndex)
+        self.resumePendingSoloStep()
+
+    def forgetFaderValues(self, trackIndex):
+        """A master changed outside of the script: its group's fader value is read from the mixer again"""
+        if trackIndex == -1:
+            self.appliedFaderValues = {}
             return
-        sleep(SLEEP_TIME)
+        for groupIndex in self.trackMembership.get(trackIndex, (set(), set()))[1]:
+            self.appliedFaderValues.pop(groupIndex, None)
 
-        for index in range(1, groupLength):
-            track = self.trackGroups[groupIndex][index]
-            if self.flApi.isTrackMuted(track) != 0:
-                self.flApi.muteTrack(track)
+    def volumeFader(self, groupIndex, value):
+        if groupIndex >= len(self.trackGroupMasters):
+            return
 
-    def volumeFader(self, fader, value):
-        groupIndex = fader - TRACKS_FIRST_FADER
-        if groupIndex < 0 or groupIndex >= len(self.trackGroupMasters):
+        # Touching the fader takes over from a running fade
+        self.volumeRamps.cancel(groupIndex)
+        self.pendingFaderValues[groupIndex] = value
+        self.movingFaders.add(groupIndex)
+        if not self.scheduler.isScheduled(FADER_APPLY_TASK):
+            self.scheduler.schedule(FADER_MIN_INTERVAL, self.applyPendingFaders, FADER_APPLY_TASK)
+
+    def applyPendingFaders(self):
+        for groupIndex, value in list(self.pendingFaderValues.items()):
+            lastValue = self.appliedFaderValues.get(groupIndex)
+            isWithinDeadBand = lastValue is not None and abs(value - lastValue) < FADER_DEAD_BAND
+            if isWithinDeadBand and groupIndex in self.movingFaders:
+                continue
+            del self.pendingFaderValues[groupIndex]
+            self.applyFaderValue(groupIndex, value)
+
+        self.movingFaders.clear()
+        if self.pendingFaderValues:
+            self.scheduler.schedule(FADER_MIN_INTERVAL, self.applyPendingFaders, FADER_APPLY_TASK)
+
+    def applyFaderValue(self, groupIndex, value):
+        if groupIndex >= len(self.trackGroupMasters):
             return
 
-        volume = (value / 127 - VOLUME_OFFSET) * MAX_VOLUME
+        self.appliedFaderValues[groupIndex] = value
+        volume = self.faderCurves.getVolume(groupIndex, value)
         for track in self.trackGroupMasters[groupIndex]:
+            self.mixerState.recordOwnWrite(track)
             self.flApi.setTrackVolume(track, volume)
 
+    def getMasterCount(self, groupIndex):
+        return len(self.trackGroupMasters[groupIndex]) if groupIndex < len(self.trackGroupMasters) else 0
+
+    def getGroupFaderValue(self, groupIndex):
+        """Current fader value (0-127) of a group, read from its first master when the script never set it"""
+        if self.volumeRamps.isRamping(groupIndex):
+            return self.volumeRamps.getCurrentValue(groupIndex)
+        value = self.appliedFaderValues.get(groupIndex)
+        if value is None:
+            value = self.readGroupFaderValue(groupIndex)
+        return value
+
+    def readGroupFaderValue(self, groupIndex):
+        volume = self.flApi.getTrackVolume(self.trackGroupMasters[groupIndex][0])
+        return self.faderCurves.getFaderValue(groupIndex, volume)
+
+    def fadeGroupTo(self, groupIndex, value):
+        """MODE + fader: ramp the group masters to the fader position over FADE_TIME"""
+        if groupIndex >= len(self.trackGroupMasters) or len(self.trackGroupMasters[groupIndex]) == 0:
+            return
+        self.pendingFaderValues.pop(groupIndex, None)
+        self.volumeRamps.start(groupIndex, self.getGroupFaderValue(groupIndex), value, FADE_TIME)
+
+    def fadeOutAll(self):
+        for groupIndex, masterTracks in enumerate(self.trackGroupMasters):
+            if len(masterTracks) > 0:
+                self.pendingFaderValues.pop(groupIndex, None)
+                self.volumeRamps.start(groupIndex, self.getGroupFaderValue(groupIndex), 0, FADE_TIME)
+
+    def captureGroupState(self):
+        return {
+            'muted': GroupState.toGroups(self.state.muted),
+            'armed': GroupState.toGroups(self.state.armed),
+            'soloed': self.state.soloed,
+            # False when the solo LED only shows the single unmuted group, recalled as the mute mask alone
+            'isSoloInMixer': self.state.soloed >= 0 and self.isSoloInMixer(self.state.soloed),
+            'faders': [self.readGroupFaderValue(index) if masterTracks else None
+                       for index, masterTracks in enumerate(self.trackGroupMasters)],
+        }
+
+    def applyGroupState(self, snapshot):
+        """Move to a captured group state, only writing the tracks whose state differs"""
+        self.resumePendingSoloStep()
+        nbGroups = len(self.trackGroups)
+        target = GroupState(GroupState.toMask(snapshot['muted']), GroupState.toMask(snapshot['armed']))
+        targetSoloed = snapshot['soloed'] if snapshot.get('isSoloInMixer', False) else -1
+        if targetSoloed >= nbGroups or (targetSoloed >= 0 and len(self.trackGroups[targetSoloed]) == 0):
+            targetSoloed = -1
+
+        soloed = self.state.soloed
+        if soloed >= 0:
+            if not self.isSoloInMixer(soloed):
+                self.state = self.state.withoutSolo()
+            elif soloed != targetSoloed:
+                self.toggleGroupSolo(soloed)
+
+        self.applyGroupCommands(
+            {index: target.isMuted(index) for index in range(nbGroups)},
+            {index: target.isArmed(index) for index in range(nbGroups)})
+
+        if targetSoloed >= 0 and targetSoloed != self.state.soloed:
+            self.toggleGroupSolo(targetSoloed)
+        elif targetSoloed < 0:
+            self.checkIfOnlyOneGroupUnmuted()
+
+        for groupIndex, value in enumerate(snapshot['faders'][:nbGroups]):
+            if value is None or len(self.trackGroupMasters[groupIndex]) == 0:
+                continue
+            self.volumeRamps.cancel(groupIndex)
+            self.pendingFaderValues.pop(groupIndex, None)
+            if self.getGroupFaderValue(groupIndex) != value:
+                self.applyFaderValue(groupIndex, value)
@@ -0,0 +1,53 @@
+from core.constants import *
+
+
+class AutoRepeater:
+    """
+    Hold-to-repeat with acceleration, advanced from the scheduler on the idle ticks.
+    The steps that fell due since the previous tick are merged into one call of the step action,
+    so a fast repeat costs one host call per tick whatever its rate.
+    """
+
+    def __init__(self, scheduler, taskKey=AUTO_REPEAT_TASK):
+        self.scheduler = scheduler
+        self.taskKey = taskKey
+        # button -> [stepAction, pressTime, stepsDone], stepAction(steps) moves by `steps` at once
+        self.heldButtons = {}
+
+    @staticmethod
+    def getStepCount(holdTime):
+        """Repeats due after holding for holdTime seconds, the rate accelerating from REPEAT_RATE to REPEAT_MAX_RATE"""
+        repeatTime = holdTime - REPEAT_DELAY
+        if repeatTime < 0:
+            return 0
+        acceleration = (REPEAT_MAX_RATE - REPEAT_RATE) / REPEAT_ACCELERATION_TIME
+        if repeatTime <= REPEAT_ACCELERATION_TIME:
+            return int(REPEAT_RATE * repeatTime + acceleration * repeatTime * repeatTime / 2)
+        acceleratedSteps = (REPEAT_RATE + REPEAT_MAX_RATE) * REPEAT_ACCELERATION_TIME / 2
+        return int(acceleratedSteps + REPEAT_MAX_RATE * (repeatTime - REPEAT_ACCELERATION_TIME))
+
+    def start(self, button, stepAction):
+        """Called after the press action ran once. A second held button is a combo: nothing repeats then"""
+        if REPEAT_RATE <= 0:
+            return
+        if self.heldButtons:
+            self.heldButtons = {}
+            self.scheduler.cancel(self.taskKey)
+            return
+        self.heldButtons[button] = [stepAction, self.scheduler.clock(), 0]
+        self.scheduler.schedule(REPEAT_DELAY, self.tick, self.taskKey)
+
+    def stop(self, button):
+        if self.heldButtons.pop(button, None) is not None and not self.heldButtons:
+            self.scheduler.cancel(self.taskKey)
+
+    def tick(self):
+        now = self.scheduler.clock()
+        for repeat in list(self.heldButtons.values()):
+            stepAction, pressTime, stepsDone = repeat
+            steps = self.getStepCount(now - pressTime) - stepsDone
+            if steps > 0:
+                repeat[2] += steps
+                stepAction(steps)
+        if self.heldButtons:
+            self.scheduler.schedule(0, self.tick, self.taskKey)
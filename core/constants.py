@@ -1,3 +1,4 @@
+import os
 import config
 
 # -->           HARDWARE
@@ -26,13 +27,84 @@ TRACKS_LAST_FADER = 50
 
 # -->           CONSTANTS
 MAX_VOLUME = 0.8
-VOLUME_OFFSET = 0.003
-SLEEP_TIME = 0.05
 FL_TOTAL_NB_TRACKS = 125
+NB_STRIPS = 8
+NB_BANKS = max(1, min(8, config.GroupBanks))
+NB_GROUPS = NB_STRIPS * NB_BANKS
 TRANSPORT_CHANNEL = config.TransportChan - 1
 MIDI_CHANNEL = config.MIDIChannel - 1
+# (track button channel, transport channel) of every unit, the first one from MIDIChannel/TransportChan
+UNIT_CHANNELS = [(MIDI_CHANNEL, TRANSPORT_CHANNEL)] + [
+    (midiChannel - 1, transportChannel - 1) for midiChannel, transportChannel in config.ExtraUnits]
 TOGGLE_MODE_BUTTONS = [PLAY_BUTTON, RECORD_BUTTON, MODE_BUTTON]
 ONE_BAR_IN_TICKS = 384
-FOUR_BARS_IN_TICKS = 1536
-HW_DIRTY_LEDS_ALTERNATIVE = 260
+SELECTION_COARSE_BARS = 4
+SONG_POS_CACHE_TTL = 0.25
+SCAN_FLASH_INTERVAL = 0.1
+SCAN_FLASH_COUNT = 2
+FADER_MIN_INTERVAL = 1 / config.FaderMaxRate if config.FaderMaxRate > 0 else 0
+FADER_DEAD_BAND = config.FaderDeadBand
+FADER_CURVE = config.FaderCurve
+FADER_CURVE_POINTS = config.FaderCurvePoints
+# Ratio between the full and the lowest non-zero position of the 'exponential' fader curve
+EXPONENTIAL_CURVE_SPAN = 1000.0
+AUDIO_TAPER_EXPONENT = 3.0
+GROUP_GAINS = config.GroupGains
+GROUP_MAX_VOLUMES = config.GroupMaxVolumes
+PROFILE_HOST_CALLS = config.ProfileHostCalls
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SNAPSHOT_FILE = os.path.join(SCRIPT_DIR, config.SnapshotFile)
+GROUP_MAP_CACHE_FILE = os.path.join(SCRIPT_DIR, config.GroupMapCacheFile)
+GROUP_OVERRIDE_FILE = os.path.join(SCRIPT_DIR, config.GroupOverrideFile)
+JOURNAL_FILE = os.path.join(SCRIPT_DIR, config.JournalFile) if config.JournalFile else None
+GROUP_MAP_CACHE_SIZE = 32
+GROUP_MAP_SAMPLE_STRIDE = config.GroupMapSampleStride
+GROUP_OVERRIDE_FINGERPRINT = 'override'
+SCAN_CHUNK_SIZE = max(1, config.ScanChunkSize)
+FADE_TIME = config.FadeTime
+RAMP_MAX_CALLS_PER_TICK = max(1, config.RampMaxCallsPerTick)
+REPEAT_DELAY = max(0, config.RepeatDelay)
+REPEAT_RATE = config.RepeatRate
+REPEAT_MAX_RATE = max(config.RepeatRate, config.RepeatMaxRate)
+REPEAT_ACCELERATION_TIME = 2.0
+# <--
+
+# -->           PRECOMPUTED BUTTON TABLES (indexed by CC number)
+SOLO_ROLE = 0
+MUTE_ROLE = 1
+ARM_ROLE = 2
+BUTTON_STRIP_INDEX = [
+    (button - TRACKS_FIRST_BUTTON) // 3 if TRACKS_FIRST_BUTTON <= button <= TRACKS_LAST_BUTTON else -1
+    for button in range(128)]
+BUTTON_ROLE = [
+    (button - TRACKS_FIRST_BUTTON) % 3 if TRACKS_FIRST_BUTTON <= button <= TRACKS_LAST_BUTTON else None
+    for button in range(128)]
+# <--
+
+# -->           METERING
+PEAK_LR = 2
+# MeterMode -> (level lighting the LED, level below which it turns off, minimum lit time in seconds)
+METER_LEVELS = {'clip': (1.0, 0.9, 1.0), 'activity': (0.05, 0.02, 0.1)}
+METER_ON_LEVEL, METER_OFF_LEVEL, METER_HOLD_TIME = METER_LEVELS.get(config.MeterMode, METER_LEVELS['clip'])
+METER_ROLE = SOLO_ROLE if config.MeterButton == 'S' else ARM_ROLE
+METER_READS_PER_TICK = max(1, config.MeterReadsPerTick)
+# <--
+
+# -->           MODIFIERS (bits selecting the active dispatch table)
+SELECTION_MODIFIER = 1
+MODE_MODIFIER = 2
+# <--
+
+# -->           SCHEDULER TASKS
+SCAN_FLASH_TASK = 'scanFlash'
+SOLO_SETTLE_TASK = 'soloSettle'
+FADER_APPLY_TASK = 'faderApply'
+MIXER_ECHO_TASK = 'mixerEcho'
+INITIAL_LEDS_TASK = 'initialLeds'
+MIXER_SCAN_TASK = 'mixerScan'
+SELECTION_WRITE_TASK = 'selectionWrite'
+REFRESH_TASK = 'refresh'
+VOLUME_RAMP_TASK = 'volumeRamp'
+AUTO_REPEAT_TASK = 'autoRepeat'
+METER_TASK = 'meter'
 # <--
@@ -0,0 +1,28 @@
+from core.constants import *
+
+
+class ControlUnit:
+    """
+    One nanoKONTROL2: its LED shadow, general controls, dispatch tables and group bank.
+    Units share the TracksManager, so a unit only maps its strips to group indexes.
+    """
+
+    def __init__(self, index, hardwareInterface):
+        self.index = index
+        self.hardwareInterface = hardwareInterface
+        # GeneralControlsManager and CC -> handler tables, set by the device script
+        self.controlsManager = None
+        self.controlChangeTables = None
+        self.bank = 0
+        self.groupOffset = 0
+        self.setBank(index % NB_BANKS)
+
+    def setBank(self, bank):
+        self.bank = bank
+        self.groupOffset = bank * NB_STRIPS
+
+    def getGroupIndex(self, button):
+        return self.groupOffset + BUTTON_STRIP_INDEX[button]
+
+    def getFaderGroupIndex(self, fader):
+        return self.groupOffset + fader - TRACKS_FIRST_FADER
@@ -0,0 +1,88 @@
+from bisect import bisect_left
+from core.constants import *
+
+
+class FaderCurves:
+    """
+    Fader value (0-127) -> mixer volume lookup tables, compiled once from the curve selected in config.py.
+    Mixer volumes are FL Studio fader positions (0.8 is 0 dB), which are not linear in amplitude:
+    curves and group gains scale the position, they are not dB values.
+    Group gains and max volumes are folded into per-group tables, groups without them share the default one.
+    """
+
+    def __init__(self, curveName=FADER_CURVE, curvePoints=FADER_CURVE_POINTS,
+                 groupGains=GROUP_GAINS, groupMaxVolumes=GROUP_MAX_VOLUMES):
+        curve = self.buildCurve(curveName, curvePoints)
+        defaultTable = self.buildTable(curve, 1.0, MAX_VOLUME)
+        # groupIndex -> 128 volumes
+        self.tables = [defaultTable] * NB_GROUPS
+        for groupNumber in set(groupGains) | set(groupMaxVolumes):
+            groupIndex = groupNumber - 1
+            if 0 <= groupIndex < NB_GROUPS:
+                self.tables[groupIndex] = self.buildTable(
+                    curve, groupGains.get(groupNumber, 1.0), groupMaxVolumes.get(groupNumber, MAX_VOLUME))
+
+    @staticmethod
+    def buildCurve(curveName, curvePoints):
+        """128 fractions between 0 and 1 of the full fader volume (MAX_VOLUME)"""
+        positions = [value / 127 for value in range(128)]
+        if curveName == 'linear':
+            return positions
+        if curveName == 'exponential':
+            return [EXPONENTIAL_CURVE_SPAN ** (position - 1) if position > 0 else 0.0 for position in positions]
+        if curveName == 'audio':
+            return [position ** AUDIO_TAPER_EXPONENT for position in positions]
+        if curveName == 'custom':
+            if curvePoints:
+                return FaderCurves.interpolatePoints(sorted(curvePoints))
+            print("FaderCurvePoints is empty, using 'linear'")
+            return positions
+        print(f"Unknown FaderCurve '{curveName}', using 'linear'")
+        return positions
+
+    @staticmethod
+    def interpolatePoints(points):
+        """Piecewise linear curve through (faderValue, gain) breakpoints, flat outside of them"""
+        curve = []
+        pointIndex = 0
+        for value in range(128):
+            while pointIndex < len(points) - 1 and points[pointIndex + 1][0] <= value:
+                pointIndex += 1
+            startValue, startGain = points[pointIndex]
+            if value <= startValue or pointIndex == len(points) - 1:
+                curve.append(startGain)
+                continue
+            endValue, endGain = points[pointIndex + 1]
+            curve.append(startGain + (endGain - startGain) * (value - startValue) / (endValue - startValue))
+        return curve
+
+    @staticmethod
+    def buildTable(curve, gain, maxVolume):
+        # Keep the table non-decreasing so getFaderValue() can search it
+        table = []
+        previousVolume = 0.0
+        for fraction in curve:
+            volume = min(maxVolume, max(previousVolume, fraction * MAX_VOLUME * gain))
+            table.append(volume)
+            previousVolume = volume
+        return table
+
+    def getVolume(self, groupIndex, value):
+        """Mixer volume of a fader value, fractional values (fades) are interpolated"""
+        table = self.tables[groupIndex]
+        index = int(value)
+        fraction = value - index
+        if fraction == 0:
+            return table[index]
+        return table[index] + (table[index + 1] - table[index]) * fraction
+
+    def getFaderValue(self, groupIndex, volume):
+        """Inverse lookup, used for groups whose volume was not set by the script"""
+        table = self.tables[groupIndex]
+        index = bisect_left(table, volume)
+        if index == 0:
+            return 0
+        if index > 127:
+            return 127
+        lowVolume, highVolume = table[index - 1], table[index]
+        return index - 1 + (volume - lowVolume) / (highVolume - lowVolume)
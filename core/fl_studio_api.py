@@ -1,15 +1,18 @@
 class FLStudioAPI:
     """Wrapper for FL Studio API functions to enable dependency injection"""
-    
-    def __init__(self, api_functions):
+
+    def __init__(self, api_functions, profiler=None):
         """
         api_functions: dict containing all FL Studio API functions
         Example: {'midiOutMsg': midiOutMsg, 'globalTransport': globalTransport, ...}
+        profiler: optional HostProfiler, every injected function is then wrapped to record its calls
         """
+        self.profiler = profiler
         for name, func in api_functions.items():
+            if profiler is not None and callable(func):
+                func = profiler.wrap(name, func)
             setattr(self, name, func)
-    
+
     def sendMidiMessage(self, message_type, channel, data1, data2):
         """Send a MIDI message"""
         self.midiOutMsg(message_type, channel, data1, data2)
-
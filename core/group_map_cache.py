@@ -0,0 +1,100 @@
+import json
+import os
+from core.constants import *
+
+
+class GroupMapCache:
+    """
+    On-disk cache of parsed group maps keyed by mixer fingerprint,
+    plus an optional override file pinning group assignments.
+    """
+
+    def __init__(self, path, overridePath):
+        self.path = path
+        self.overridePath = overridePath
+        # fingerprint -> {'groups': [[track, ...], ...], 'masters': [[track, ...], ...]}
+        self.entries = None
+
+    @staticmethod
+    def readJson(path):
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as jsonFile:
+                return json.load(jsonFile)
+        except (OSError, ValueError) as error:
+            print(f"Could not read {path}: {error}")
+            return None
+
+    def loadOverride(self):
+        """
+        Returns (trackGroups, trackGroupMasters) from the override file, or None.
+        Format: {"groups": {"1": {"members": [1, 2, 3], "masters": [10]}, ...}}
+        Masters are also members of their group, like `[N]` tracks.
+        """
+        override = self.readJson(self.overridePath)
+        if override is None:
+            return None
+
+        trackGroups = [[] for index in range(NB_GROUPS)]
+        trackGroupMasters = [[] for index in range(NB_GROUPS)]
+        try:
+            for groupNumber, assignment in override.get('groups', {}).items():
+                groupIndex = int(groupNumber) - 1
+                if groupIndex < 0 or groupIndex >= NB_GROUPS:
+                    continue
+                masters = self.checkTracks(assignment.get('masters', []))
+                trackGroups[groupIndex] = sorted(set(self.checkTracks(assignment.get('members', []))) | set(masters))
+                trackGroupMasters[groupIndex] = masters
+        except (AttributeError, TypeError, ValueError) as error:
+            print(f"Ignoring {self.overridePath}, expected {{\"groups\": {{\"1\": {{\"members\": [...], \"masters\": [...]}}}}}}: {error}")
+            return None
+        return trackGroups, trackGroupMasters
+
+    @staticmethod
+    def checkTracks(tracks):
+        """Sorted mixer track indexes of a hand-written or cached list, raises ValueError on anything else"""
+        if not isinstance(tracks, list):
+            raise ValueError(f"{tracks!r} is not a list of track indexes")
+        for track in tracks:
+            if not isinstance(track, int) or track < 0 or track > FL_TOTAL_NB_TRACKS:
+                raise ValueError(f"{track!r} is not a mixer track index")
+        return sorted(set(tracks))
+
+    def getEntries(self):
+        if self.entries is None:
+            self.entries = self.readJson(self.path) or {}
+            if not isinstance(self.entries, dict):
+                print(f"Ignoring {self.path}, expected an object of group maps")
+                self.entries = {}
+        return self.entries
+
+    def get(self, fingerprint):
+        entry = self.getEntries().get(fingerprint)
+        if entry is None:
+            return None
+        try:
+            if len(entry['groups']) != NB_GROUPS or len(entry['masters']) != NB_GROUPS:
+                return None
+            # Copies: the group lists are patched in place when tracks are renamed
+            return ([self.checkTracks(tracks) for tracks in entry['groups']],
+                     [self.checkTracks(tracks) for tracks in entry['masters']])
+        except (KeyError, TypeError, ValueError) as error:
+            print(f"Ignoring the cached group map {fingerprint}: {error}")
+            return None
+
+    def put(self, fingerprint, trackGroups, trackGroupMasters):
+        entries = self.getEntries()
+        entries.pop(fingerprint, None)
+        entries[fingerprint] = {
+            'groups': [list(tracks) for tracks in trackGroups],
+            'masters': [list(tracks) for tracks in trackGroupMasters],
+        }
+        while len(entries) > GROUP_MAP_CACHE_SIZE:
+            del entries[next(iter(entries))]
+
+        try:
+            with open(self.path, 'w', encoding='utf-8') as cacheFile:
+                json.dump(entries, cacheFile)
+        except OSError as error:
+            print(f"Could not write {self.path}: {error}")
@@ -0,0 +1,78 @@
+from core.constants import *
+
+
+class GroupMeter:
+    """
+    Optional group master metering shown on the strip LEDs.
+    At most METER_READS_PER_TICK getTrackPeaks() calls per idle tick, round-robin over the metered masters,
+    and a group's LED only changes past the on/off levels (hysteresis) and after METER_HOLD_TIME.
+    """
+
+    def __init__(self, flApi, scheduler, onChange):
+        self.flApi = flApi
+        self.scheduler = scheduler
+        # Called when litMask changes
+        self.onChange = onChange
+        self.isEnabled = False
+        # [(groupIndex, track), ...] polled in turn
+        self.meteredTracks = []
+        # groupIndex -> master tracks, for the group level
+        self.groupTracks = {}
+        self.trackPeaks = {}
+        self.nextIndex = 0
+        # Bit N set while group N's meter LED is lit
+        self.litMask = 0
+        # groupIndex -> time the LED was last lit or refreshed
+        self.litTimes = {}
+        self.readCount = 0
+
+    def setEnabled(self, isEnabled):
+        self.isEnabled = isEnabled
+        self.trackPeaks = {}
+        self.litMask = 0
+        self.litTimes = {}
+        if isEnabled:
+            self.scheduler.schedule(0, self.tick, METER_TASK)
+        else:
+            self.scheduler.cancel(METER_TASK)
+
+    def setGroups(self, groupTracks):
+        """groupTracks: groupIndex -> master tracks of the groups to meter"""
+        self.groupTracks = groupTracks
+        self.meteredTracks = [
+            (groupIndex, track) for groupIndex, tracks in sorted(groupTracks.items()) for track in tracks]
+        self.nextIndex = 0
+        self.trackPeaks = {}
+        metered = 0
+        for groupIndex in groupTracks:
+            metered |= 1 << groupIndex
+        self.litMask &= metered
+
+    def tick(self):
+        nbReads = min(METER_READS_PER_TICK, len(self.meteredTracks))
+        readGroups = set()
+        for index in range(nbReads):
+            groupIndex, track = self.meteredTracks[self.nextIndex]
+            self.nextIndex = (self.nextIndex + 1) % len(self.meteredTracks)
+            self.trackPeaks[track] = self.flApi.getTrackPeaks(track, PEAK_LR)
+            readGroups.add(groupIndex)
+        self.readCount += nbReads
+
+        now = self.scheduler.clock()
+        litMask = self.litMask
+        for groupIndex in readGroups:
+            level = max(self.trackPeaks.get(track, 0.0) for track in self.groupTracks[groupIndex])
+            groupBit = 1 << groupIndex
+            if level >= METER_ON_LEVEL or (litMask & groupBit and level >= METER_OFF_LEVEL):
+                litMask |= groupBit
+                self.litTimes[groupIndex] = now
+            elif litMask & groupBit and now - self.litTimes[groupIndex] >= METER_HOLD_TIME:
+                litMask &= ~groupBit
+
+        if litMask != self.litMask:
+            self.litMask = litMask
+            self.onChange()
+        self.scheduler.schedule(0, self.tick, METER_TASK)
+
+    def getStats(self):
+        return f"Metering: {self.readCount} peak reads"
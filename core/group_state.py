@@ -0,0 +1,77 @@
+from core.constants import *
+
+
+class GroupState:
+    """
+    Immutable mute/arm/solo model of the groups: bit N of `muted` and `armed` stands for group N.
+    Transitions return a new state, and the S/M/R LEDs of a bank are derived from it in one step.
+    """
+
+    def __init__(self, muted=0, armed=0, soloed=-1):
+        self.muted = muted
+        self.armed = armed
+        self.soloed = soloed
+
+    @staticmethod
+    def toMask(groups):
+        mask = 0
+        for groupIndex in groups:
+            mask |= 1 << groupIndex
+        return mask
+
+    @staticmethod
+    def toGroups(mask):
+        return [groupIndex for groupIndex in range(mask.bit_length()) if mask >> groupIndex & 1]
+
+    def isMuted(self, groupIndex):
+        return self.muted >> groupIndex & 1 == 1
+
+    def isArmed(self, groupIndex):
+        return self.armed >> groupIndex & 1 == 1
+
+    def isAnyMuted(self, groups):
+        return any(self.muted >> groupIndex & 1 for groupIndex in groups)
+
+    def isAnyArmed(self, groups):
+        return any(self.armed >> groupIndex & 1 for groupIndex in groups)
+
+    def withMuted(self, muteMask, unmuteMask=0):
+        return GroupState((self.muted | muteMask) & ~unmuteMask, self.armed, self.soloed)
+
+    def withArmed(self, armMask, disarmMask=0):
+        return GroupState(self.muted, (self.armed | armMask) & ~disarmMask, self.soloed)
+
+    def withSolo(self, groupIndex, nbGroups):
+        """FL Studio's solo: every other group is muted"""
+        return GroupState(((1 << nbGroups) - 1) & ~(1 << groupIndex), self.armed, groupIndex)
+
+    def withUnsolo(self):
+        """Leaving FL Studio's solo unmutes every group"""
+        return GroupState(0, self.armed, -1)
+
+    def withoutSolo(self):
+        return GroupState(self.muted, self.armed, -1)
+
+    def withSingleUnmutedAsSolo(self, nbGroups):
+        """Show the solo LED of the only unmuted group, if exactly one is"""
+        unmuted = ((1 << nbGroups) - 1) & ~self.muted
+        if unmuted == 0 or unmuted & (unmuted - 1) or unmuted.bit_length() - 1 == self.soloed:
+            return self
+        return GroupState(self.muted, self.armed, unmuted.bit_length() - 1)
+
+    def getStripLights(self, bank, meterMask=None):
+        """
+        The 24 S/M/R LEDs of a bank, strip by strip: S for the soloed group, M while unmuted, R while armed.
+        meterMask: lit meters replacing the METER_ROLE LEDs while metering is on
+        """
+        firstGroup = bank * NB_STRIPS
+        muted = self.muted >> firstGroup
+        armed = self.armed >> firstGroup
+        lights = []
+        for strip in range(NB_STRIPS):
+            lights += [self.soloed == firstGroup + strip, not muted >> strip & 1, armed >> strip & 1 == 1]
+        if meterMask is not None:
+            meters = meterMask >> firstGroup
+            for strip in range(NB_STRIPS):
+                lights[strip * 3 + METER_ROLE] = meters >> strip & 1 == 1
+        return lights
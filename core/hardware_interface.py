@@ -3,17 +3,63 @@ from core.constants import *
 
 class HardwareInterface:
     """Hardware interface for MIDI communication"""
-    
-    def __init__(self, flApi):
+
+    def __init__(self, flApi, trackChannel=MIDI_CHANNEL, transportChannel=TRANSPORT_CHANNEL):
         self.flApi = flApi
-    
+        self.trackChannel = trackChannel
+        # button -> MIDI channel of its LED
+        self.buttonChannels = [
+            trackChannel if button >= TRACKS_FIRST_BUTTON else transportChannel for button in range(128)]
+        # S/M/R LED values last given to updateTrackLights(), None when unknown
+        self.trackLights = [None] * (TRACKS_LAST_BUTTON - TRACKS_FIRST_BUTTON + 1)
+        # (channel, button) -> last LED value sent to the hardware
+        self.ledShadow = {}
+        # (channel, button) -> LED value waiting for the next flush
+        self.pendingLeds = {}
+        self.sentCount = 0
+        self.suppressedCount = 0
+
     def updateButtonLight(self, button, turnOn=False):
         value = 127 if turnOn else 0
-        channel = MIDI_CHANNEL if button >= TRACKS_FIRST_BUTTON else TRANSPORT_CHANNEL
-        self.flApi.sendMidiMessage(self.flApi.MIDI_CONTROLCHANGE, channel, button, value)
-    
+        self.queueLight(self.buttonChannels[button], button, value)
+
     def updateTracksButtons(self, turnOn=False):
         value = 127 if turnOn else 0
         for index in range(TRACKS_FIRST_BUTTON, TRACKS_LAST_BUTTON + 1):
-            self.flApi.sendMidiMessage(self.flApi.MIDI_CONTROLCHANGE, MIDI_CHANNEL, index, value)
+            self.queueLight(self.trackChannel, index, value)
+        self.trackLights = [turnOn] * len(self.trackLights)
+
+    def updateTrackLights(self, lights):
+        """Queue the S/M/R LEDs (strip by strip) that differ from the previous call"""
+        for index, turnOn in enumerate(lights):
+            if self.trackLights[index] != turnOn:
+                self.trackLights[index] = turnOn
+                self.queueLight(self.trackChannel, TRACKS_FIRST_BUTTON + index, 127 if turnOn else 0)
+
+    def queueLight(self, channel, button, value):
+        key = (channel, button)
+        if key in self.pendingLeds:
+            self.suppressedCount += 1
+        self.pendingLeds[key] = value
+
+    def flush(self):
+        """Send the pending LED values that differ from what the hardware already shows"""
+        if not self.pendingLeds:
+            return
+
+        for key, value in self.pendingLeds.items():
+            if self.ledShadow.get(key) == value:
+                self.suppressedCount += 1
+                continue
+            self.ledShadow[key] = value
+            self.sentCount += 1
+            self.flApi.sendMidiMessage(self.flApi.MIDI_CONTROLCHANGE, key[0], key[1], value)
+        self.pendingLeds = {}
+
+    def invalidate(self):
+        """Forget the LED shadow so the next flush resends every queued value"""
+        self.ledShadow = {}
+        self.trackLights = [None] * len(self.trackLights)
 
+    def getStats(self):
+        return f"LED messages: {self.sentCount} sent, {self.suppressedCount} suppressed"
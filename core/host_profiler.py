@@ -0,0 +1,75 @@
+from time import perf_counter
+
+# Upper bounds (ms) of the callback latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = [0.1, 0.5, 1, 2, 5, 10, 50]
+
+
+class HostProfiler:
+    """Host call counts and time attributed to the FL Studio callback that issued them"""
+
+    def __init__(self, clock=perf_counter):
+        self.clock = clock
+        self.currentCallback = 'outside callbacks'
+        self.callbackStartTime = 0.0
+        # callback -> {functionName: [count, cumulativeTime]}
+        self.callStats = {}
+        # callback -> bucket counts (len(LATENCY_BUCKETS_MS) + 1 entries)
+        self.latencyHistograms = {}
+
+    def wrap(self, name, func):
+        clock = self.clock
+
+        def profiledFunction(*args):
+            startTime = clock()
+            result = func(*args)
+            self.recordCall(name, clock() - startTime)
+            return result
+
+        return profiledFunction
+
+    def recordCall(self, name, duration):
+        functionStats = self.callStats.setdefault(self.currentCallback, {})
+        stats = functionStats.get(name)
+        if stats is None:
+            functionStats[name] = [1, duration]
+        else:
+            stats[0] += 1
+            stats[1] += duration
+
+    def enterCallback(self, callbackName):
+        self.currentCallback = callbackName
+        self.callbackStartTime = self.clock()
+
+    def exitCallback(self):
+        durationMs = (self.clock() - self.callbackStartTime) * 1000
+        histogram = self.latencyHistograms.get(self.currentCallback)
+        if histogram is None:
+            histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+            self.latencyHistograms[self.currentCallback] = histogram
+
+        bucket = 0
+        while bucket < len(LATENCY_BUCKETS_MS) and durationMs > LATENCY_BUCKETS_MS[bucket]:
+            bucket += 1
+        histogram[bucket] += 1
+        self.currentCallback = 'outside callbacks'
+
+    def reset(self):
+        self.callStats = {}
+        self.latencyHistograms = {}
+
+    def getReport(self):
+        lines = ['*** Host call profile ***']
+        callbacks = sorted(set(self.callStats) | set(self.latencyHistograms))
+        for callbackName in callbacks:
+            histogram = self.latencyHistograms.get(callbackName)
+            if histogram is None:
+                lines.append(f"{callbackName}")
+            else:
+                buckets = [f"<{bound}ms: {count}" for bound, count in zip(LATENCY_BUCKETS_MS, histogram)]
+                buckets.append(f">{LATENCY_BUCKETS_MS[-1]}ms: {histogram[-1]}")
+                lines.append(f"{callbackName} ({sum(histogram)} calls) {' | '.join(buckets)}")
+
+            functionStats = self.callStats.get(callbackName, {})
+            for name, (count, duration) in sorted(functionStats.items(), key=lambda item: -item[1][1]):
+                lines.append(f"    {name}: {count} calls, {duration * 1000:.2f} ms")
+        return '\n'.join(lines)
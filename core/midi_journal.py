@@ -0,0 +1,54 @@
+from time import perf_counter
+
+JOURNAL_HEADER = '# nanoKONTROL2 MIDI journal v1: time_ms channel data1 data2'
+
+
+class MidiJournal:
+    """
+    Line-oriented log of the incoming control changes, one `time_ms channel data1 data2` line each.
+    Lines are buffered and appended to the file from the idle callback.
+    """
+
+    def __init__(self, path, clock=perf_counter):
+        self.path = path
+        self.clock = clock
+        self.startTime = None
+        self.pendingLines = []
+
+    def record(self, event):
+        now = self.clock()
+        if self.startTime is None:
+            self.startTime = now
+            self.pendingLines.append(JOURNAL_HEADER)
+        self.pendingLines.append(
+            f"{(now - self.startTime) * 1000:.3f} {event.midiChan} {event.data1} {event.data2}")
+
+    def flush(self):
+        if not self.pendingLines:
+            return
+        lines = self.pendingLines
+        self.pendingLines = []
+        try:
+            with open(self.path, 'a', encoding='utf-8') as journalFile:
+                journalFile.write('\n'.join(lines) + '\n')
+        except OSError as error:
+            print(f"Could not write the MIDI journal {self.path}: {error}")
+
+    @staticmethod
+    def read(path):
+        """
+        Returns [(time, channel, data1, data2), ...] with times in seconds.
+        Each header line starts a new session, whose times continue after the previous one.
+        """
+        events = []
+        sessionOffset = 0.0
+        with open(path, 'r', encoding='utf-8') as journalFile:
+            for line in journalFile:
+                if line.startswith('#'):
+                    sessionOffset = events[-1][0] if events else 0.0
+                    continue
+                fields = line.split()
+                if len(fields) != 4:
+                    continue
+                events.append((sessionOffset + float(fields[0]) / 1000, int(fields[1]), int(fields[2]), int(fields[3])))
+        return events
@@ -0,0 +1,166 @@
+import re
+import zlib
+from time import perf_counter
+from core.constants import *
+
+GROUP_MEMBER_OR_MASTER_TAG = re.compile(r"\(([1-9][0-9]*)\)|\[([1-9][0-9]*)\]")
+
+
+class MixerScanner:
+    """Builds the group indexes by reading every mixer track name exactly once"""
+
+    def __init__(self, flApi):
+        self.flApi = flApi
+        self.lastCallCount = 0
+        self.lastDuration = 0.0
+        self.lastTickCount = 0
+        # Track count + CRC of the sampled track names, identifies a mixer layout
+        self.lastFingerprint = None
+        # trackIndex -> sampled name read by the last sampleFingerprint() call or finished scan
+        self.sampledNames = {}
+        self.sampledTrackCount = 0
+
+    @staticmethod
+    def parseTrackName(trackName):
+        """
+        Returns (groups, masterGroups) as sets of 0-based group indexes.
+        A master tag `[N]` also makes the track a member of group N.
+        """
+        groups = set()
+        masterGroups = set()
+        for memberTag, masterTag in GROUP_MEMBER_OR_MASTER_TAG.findall(trackName):
+            groupIndex = int(memberTag or masterTag) - 1
+            if groupIndex >= NB_GROUPS:
+                continue
+            groups.add(groupIndex)
+            if masterTag:
+                masterGroups.add(groupIndex)
+        return groups, masterGroups
+
+    @staticmethod
+    def buildFingerprint(trackCount, sampledNames):
+        fingerprint = 0
+        for trackIndex in sorted(sampledNames):
+            fingerprint = zlib.crc32(sampledNames[trackIndex].encode('utf-8', 'replace') + b'\0', fingerprint)
+        return f"{trackCount}-{fingerprint:08x}"
+
+    def sampleFingerprint(self):
+        """Cheap mixer identity: the track count plus a CRC of every GROUP_MAP_SAMPLE_STRIDE-th name"""
+        startTime = perf_counter()
+        self.sampledTrackCount = self.flApi.trackCount()
+        self.sampledNames = {}
+        for trackIndex in range(0, FL_TOTAL_NB_TRACKS + 1, GROUP_MAP_SAMPLE_STRIDE):
+            self.sampledNames[trackIndex] = self.flApi.getTrackName(trackIndex)
+
+        self.lastFingerprint = self.buildFingerprint(self.sampledTrackCount, self.sampledNames)
+        self.lastCallCount = len(self.sampledNames) + 1
+        self.lastDuration = perf_counter() - startTime
+        self.lastTickCount = 0
+        return self.lastFingerprint
+
+    def startScan(self, isAfterSampling=False):
+        """
+        Full scan as a resumable MixerScanJob.
+        isAfterSampling: reuse the names of a directly preceding sampleFingerprint() call
+        """
+        if isAfterSampling:
+            return MixerScanJob(self.flApi, self.sampledTrackCount, dict(self.sampledNames))
+        return MixerScanJob(self.flApi)
+
+    def finishScan(self, job):
+        """Record the fingerprint and stats of a completed job, returns the fingerprint"""
+        self.sampledTrackCount = job.trackCount
+        self.sampledNames = job.sampledNames
+        self.lastFingerprint = self.buildFingerprint(job.trackCount, job.sampledNames)
+        if job.isAfterSampling:
+            # Report the fingerprint pass and the scan as one operation
+            self.lastCallCount += job.callCount
+            self.lastDuration += job.duration
+        else:
+            self.lastCallCount = job.callCount
+            self.lastDuration = job.duration
+        self.lastTickCount = job.stepCount
+        return self.lastFingerprint
+
+    def updateSampledName(self, trackIndex, trackName):
+        """Keep the fingerprint in sync with a renamed track, returns the fingerprint"""
+        if self.sampledNames.get(trackIndex, trackName) != trackName:
+            self.sampledNames[trackIndex] = trackName
+            self.lastFingerprint = self.buildFingerprint(self.sampledTrackCount, self.sampledNames)
+        return self.lastFingerprint
+
+    def getReport(self):
+        return (f"Mixer scan: {self.lastCallCount} host calls in {self.lastDuration * 1000:.1f} ms"
+                f" over {self.lastTickCount} idle ticks")
+
+
+class MixerScanJob:
+    """Full mixer scan split in steps reading a bounded number of track names each"""
+
+    def __init__(self, flApi, trackCount=None, knownNames=None):
+        self.flApi = flApi
+        self.trackCount = trackCount
+        self.isAfterSampling = knownNames is not None
+        # trackIndex -> name read before the job started, dropped when the track is reported dirty
+        self.knownNames = knownNames or {}
+        self.nextTrack = 0
+        # Tracks already read by the job that FL Studio reported dirty since
+        self.dirtyTracks = set()
+        # trackIndex -> (groups, masterGroups) of every grouped track read so far
+        self.membership = {}
+        self.sampledNames = {}
+        self.callCount = 0
+        self.duration = 0.0
+        self.stepCount = 0
+
+    def markDirty(self, trackIndex):
+        self.knownNames.pop(trackIndex, None)
+        if trackIndex < self.nextTrack:
+            self.dirtyTracks.add(trackIndex)
+
+    def readTrack(self, trackIndex):
+        trackName = self.knownNames.pop(trackIndex, None)
+        if trackName is None:
+            trackName = self.flApi.getTrackName(trackIndex)
+            self.callCount += 1
+        if trackIndex % GROUP_MAP_SAMPLE_STRIDE == 0:
+            self.sampledNames[trackIndex] = trackName
+
+        groups, masterGroups = MixerScanner.parseTrackName(trackName)
+        if groups:
+            self.membership[trackIndex] = (groups, masterGroups)
+        else:
+            self.membership.pop(trackIndex, None)
+
+    def step(self, chunkSize):
+        """Read up to chunkSize track names, returns True once the whole mixer is read"""
+        startTime = perf_counter()
+        self.stepCount += 1
+        if self.trackCount is None:
+            self.trackCount = self.flApi.trackCount()
+            self.callCount += 1
+
+        lastTrack = min(self.nextTrack + chunkSize, FL_TOTAL_NB_TRACKS + 1)
+        chunkSize -= lastTrack - self.nextTrack
+        for trackIndex in range(self.nextTrack, lastTrack):
+            self.readTrack(trackIndex)
+        self.nextTrack = lastTrack
+
+        # Tracks renamed behind the job are read again once the first pass is done
+        while self.dirtyTracks and chunkSize > 0 and self.nextTrack > FL_TOTAL_NB_TRACKS:
+            self.readTrack(self.dirtyTracks.pop())
+            chunkSize -= 1
+
+        self.duration += perf_counter() - startTime
+        return self.nextTrack > FL_TOTAL_NB_TRACKS and not self.dirtyTracks
+
+    def getGroupMap(self):
+        trackGroups = [[] for index in range(NB_GROUPS)]
+        trackGroupMasters = [[] for index in range(NB_GROUPS)]
+        for trackIndex in sorted(self.membership):
+            groups, masterGroups = self.membership[trackIndex]
+            for groupIndex in groups:
+                trackGroups[groupIndex].append(trackIndex)
+            for groupIndex in masterGroups:
+                trackGroupMasters[groupIndex].append(trackIndex)
+        return trackGroups, trackGroupMasters
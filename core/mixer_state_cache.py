@@ -0,0 +1,86 @@
+from core.constants import *
+
+
+class MixerStateCache:
+    """
+    Mirror of the mute/solo/arm state of the tracks referenced by the group index.
+    Entries are read from FL Studio on first use, updated by our own writes and invalidated
+    per track by FL Studio's mixer-dirty notifications.
+    """
+
+    def __init__(self, flApi, scheduler):
+        self.flApi = flApi
+        self.scheduler = scheduler
+        self.muted = {}
+        self.soloed = {}
+        self.armed = {}
+        # Tracks written by the script whose mixer-dirty echo has not arrived yet
+        self.ownWrites = set()
+
+    def isMuted(self, track):
+        muted = self.muted.get(track)
+        if muted is None:
+            muted = self.flApi.isTrackMuted(track) != 0
+            self.muted[track] = muted
+        return muted
+
+    def isSoloed(self, track):
+        soloed = self.soloed.get(track)
+        if soloed is None:
+            soloed = self.flApi.isTrackSolo(track) != 0
+            self.soloed[track] = soloed
+        return soloed
+
+    def isArmed(self, track):
+        armed = self.armed.get(track)
+        if armed is None:
+            armed = self.flApi.isTrackArmed(track) != 0
+            self.armed[track] = armed
+        return armed
+
+    def setMuted(self, track, muted):
+        if self.isMuted(track) != muted:
+            self.recordOwnWrite(track)
+            self.flApi.muteTrack(track)
+            self.muted[track] = muted
+
+    def setArmed(self, track, armed):
+        if self.isArmed(track) != armed:
+            self.recordOwnWrite(track)
+            self.flApi.armTrack(track)
+            self.armed[track] = armed
+
+    def toggleSolo(self, track):
+        # A solo changes the mute and solo state of the whole mixer, and FL applies it asynchronously
+        self.flApi.soloTrack(track)
+        self.invalidate(-1)
+
+    def recordOwnWrite(self, track):
+        self.ownWrites.add(track)
+        if not self.scheduler.isScheduled(MIXER_ECHO_TASK):
+            # Writes made from a mixer-dirty callback run before the tick of the same idle cycle,
+            # so keep the echoes for one full tick before dropping them
+            self.scheduler.scheduleSequence(0, [lambda: None, self.clearOwnWrites], MIXER_ECHO_TASK)
+
+    def clearOwnWrites(self):
+        self.ownWrites = set()
+
+    def onTrackDirty(self, track):
+        """Called from OnDirtyMixerTrack, -1 means every track changed. Returns False for echoes of our own writes"""
+        if track in self.ownWrites:
+            self.ownWrites.discard(track)
+            return False
+        self.invalidate(track)
+        return True
+
+    def invalidate(self, track):
+        if track == -1:
+            self.muted = {}
+            self.soloed = {}
+            self.armed = {}
+            self.ownWrites = set()
+            self.scheduler.cancel(MIXER_ECHO_TASK)
+            return
+        self.muted.pop(track, None)
+        self.soloed.pop(track, None)
+        self.armed.pop(track, None)
@@ -0,0 +1,38 @@
+from core.constants import *
+
+
+class RefreshCoalescer:
+    """
+    Decodes the OnRefresh flag bitmask into dirty subsystems and updates each of them
+    once on the next idle tick, however many refreshes FL Studio sent meanwhile.
+    """
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        # [(flagMask, update), ...] in update order
+        self.subsystems = []
+        self.dirtyUpdates = set()
+        self.refreshCount = 0
+        self.updateCount = 0
+
+    def register(self, flagMask, update):
+        self.subsystems.append((flagMask, update))
+
+    def onRefresh(self, flag):
+        self.refreshCount += 1
+        for flagMask, update in self.subsystems:
+            if flag & flagMask:
+                self.dirtyUpdates.add(update)
+        if self.dirtyUpdates and not self.scheduler.isScheduled(REFRESH_TASK):
+            self.scheduler.schedule(0, self.runDirtyUpdates, REFRESH_TASK)
+
+    def runDirtyUpdates(self):
+        dirtyUpdates = self.dirtyUpdates
+        self.dirtyUpdates = set()
+        for flagMask, update in self.subsystems:
+            if update in dirtyUpdates:
+                self.updateCount += 1
+                update()
+
+    def getStats(self):
+        return f"Refreshes: {self.refreshCount} received, {self.updateCount} subsystem updates"
@@ -0,0 +1,54 @@
+from time import perf_counter
+
+
+class Scheduler:
+    """Timed actions run from FL Studio's OnIdle callback instead of blocking with sleep()"""
+
+    def __init__(self, clock=perf_counter):
+        self.clock = clock
+        # key -> (dueTime, callback)
+        self.tasks = {}
+        self.nextTaskId = 0
+
+    def schedule(self, delay, callback, key=None):
+        """
+        Run callback on the first idle tick after `delay` seconds.
+        Scheduling with the key of a pending task replaces that task.
+        """
+        if key is None:
+            key = self.nextTaskId
+            self.nextTaskId += 1
+        self.tasks[key] = (self.clock() + delay, callback)
+        return key
+
+    def scheduleSequence(self, interval, callbacks, key):
+        """Run callbacks one per frame, `interval` seconds apart, as a single cancellable task"""
+        remainingFrames = list(callbacks)
+
+        def runNextFrame():
+            remainingFrames.pop(0)()
+            if remainingFrames:
+                self.schedule(interval, runNextFrame, key)
+
+        if remainingFrames:
+            self.schedule(0, runNextFrame, key)
+
+    def cancel(self, key):
+        self.tasks.pop(key, None)
+
+    def isScheduled(self, key):
+        return key in self.tasks
+
+    def tick(self):
+        if not self.tasks:
+            return
+
+        now = self.clock()
+        dueKeys = [key for key, (dueTime, callback) in self.tasks.items() if dueTime <= now]
+        for key in dueKeys:
+            task = self.tasks.get(key)
+            # An earlier callback of this tick may have cancelled or rescheduled the task
+            if task is None or task[0] > now:
+                continue
+            del self.tasks[key]
+            task[1]()
@@ -0,0 +1,44 @@
+import json
+import os
+
+
+class SnapshotStore:
+    """JSON file holding group mix snapshots per mixer layout (keyed by mixer fingerprint)"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def readAll(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as snapshotFile:
+                return json.load(snapshotFile)
+        except (OSError, ValueError) as error:
+            print(f"Could not read snapshots from {self.path}: {error}")
+            return {}
+
+    def load(self, fingerprint):
+        """Returns {slot: snapshot} for the given mixer layout"""
+        snapshots = self.readAll().get(fingerprint, {})
+        return {int(slot): snapshot for slot, snapshot in snapshots.items()}
+
+    def save(self, fingerprint, snapshots):
+        allSnapshots = self.readAll()
+        allSnapshots[fingerprint] = {str(slot): snapshot for slot, snapshot in snapshots.items()}
+        self.writeAll(allSnapshots)
+
+    def move(self, oldFingerprint, newFingerprint):
+        """Re-key the snapshots of a mixer layout whose fingerprint changed"""
+        allSnapshots = self.readAll()
+        if oldFingerprint not in allSnapshots:
+            return
+        allSnapshots[newFingerprint] = allSnapshots.pop(oldFingerprint)
+        self.writeAll(allSnapshots)
+
+    def writeAll(self, allSnapshots):
+        try:
+            with open(self.path, 'w', encoding='utf-8') as snapshotFile:
+                json.dump(allSnapshots, snapshotFile, indent=1)
+        except OSError as error:
+            print(f"Could not write snapshots to {self.path}: {error}")
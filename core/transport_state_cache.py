@@ -0,0 +1,97 @@
+from time import perf_counter
+from core.constants import *
+
+
+class TransportStateCache:
+    """
+    Song position, playlist selection and bar length for marker and selection navigation.
+    Known values are trusted for SONG_POS_CACHE_TTL seconds, beat callbacks and transport
+    actions drop the song position, and selection writes are merged until the next idle tick.
+    """
+
+    def __init__(self, flApi, scheduler, clock=perf_counter):
+        self.flApi = flApi
+        self.scheduler = scheduler
+        self.clock = clock
+        self.ticksPerBar = None
+        self.songPos = None
+        self.songPosTime = 0.0
+        # (start, end) of the playlist selection as last read or written
+        self.selection = None
+        self.selectionTime = 0.0
+        # (start, end) waiting for the next idle tick
+        self.pendingSelection = None
+
+    def getTicksPerBar(self):
+        """Bar length of the project (PPQ x beats per bar), read once per project"""
+        if self.ticksPerBar is None:
+            ticksPerBar = self.flApi.getRecPPB()
+            self.ticksPerBar = ticksPerBar if ticksPerBar > 0 else ONE_BAR_IN_TICKS
+        return self.ticksPerBar
+
+    def onProjectLoad(self):
+        self.ticksPerBar = None
+        self.invalidateSongPos()
+        self.selection = None
+
+    def isFresh(self, knownTime):
+        return self.clock() - knownTime < SONG_POS_CACHE_TTL
+
+    def getSongPos(self):
+        if self.songPos is None or not self.isFresh(self.songPosTime):
+            self.songPos = self.flApi.getSongPos(2)
+            self.songPosTime = self.clock()
+        return self.songPos
+
+    def setSongPos(self, position):
+        if self.songPos == position and self.isFresh(self.songPosTime):
+            return
+        self.flApi.setSongPos(position, 2)
+        self.songPos = position
+        self.songPosTime = self.clock()
+
+    def invalidateSongPos(self):
+        """Called on beat callbacks and transport actions, which move the song position"""
+        self.songPos = None
+
+    @staticmethod
+    def normalizeSelection(start, end):
+        # FL Studio reports an empty selection as (-1, -1)
+        return (start, end) if start != end else (-1, -1)
+
+    def getSelection(self):
+        if self.pendingSelection is not None:
+            return self.normalizeSelection(*self.pendingSelection)
+        if self.selection is None or not self.isFresh(self.selectionTime):
+            self.selection = (self.flApi.selectionStart(), self.flApi.selectionEnd())
+            self.selectionTime = self.clock()
+        return self.selection
+
+    def setSelection(self, start, end):
+        self.pendingSelection = (start, end)
+        if not self.scheduler.isScheduled(SELECTION_WRITE_TASK):
+            self.scheduler.schedule(0, self.writeSelection, SELECTION_WRITE_TASK)
+
+    def writeSelection(self):
+        """Send the merged selection, skipping the edges FL Studio already has"""
+        if self.pendingSelection is None:
+            return
+        start, end = self.pendingSelection
+        self.pendingSelection = None
+        knownStart, knownEnd = None, None
+        if self.selection is not None and self.isFresh(self.selectionTime):
+            knownStart, knownEnd = self.selection
+
+        # Move the end first when the new start lies past the current end
+        if knownEnd is not None and start > knownEnd:
+            self.writeSelectionEdge(end, knownEnd, True)
+            self.writeSelectionEdge(start, knownStart, False)
+        else:
+            self.writeSelectionEdge(start, knownStart, False)
+            self.writeSelectionEdge(end, knownEnd, True)
+        self.selection = self.normalizeSelection(start, end)
+        self.selectionTime = self.clock()
+
+    def writeSelectionEdge(self, time, knownTime, updateEnd):
+        if time != knownTime:
+            self.flApi.liveSelection(time, updateEnd)
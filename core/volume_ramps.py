@@ -0,0 +1,56 @@
+from core.constants import *
+
+
+class VolumeRampEngine:
+    """
+    Timed group volume ramps advanced from the scheduler instead of sleep().
+    Each tick spends at most RAMP_MAX_CALLS_PER_TICK host calls across the active ramps, in round-robin order.
+    """
+
+    def __init__(self, scheduler, applyValue, getCallCount):
+        self.scheduler = scheduler
+        # applyValue(groupIndex, faderValue), making getCallCount(groupIndex) host calls
+        self.applyValue = applyValue
+        self.getCallCount = getCallCount
+        # groupIndex -> (startValue, targetValue, startTime, duration), in round-robin order
+        self.ramps = {}
+
+    def start(self, groupIndex, startValue, targetValue, duration):
+        self.ramps.pop(groupIndex, None)
+        self.ramps[groupIndex] = (startValue, targetValue, self.scheduler.clock(), duration)
+        if not self.scheduler.isScheduled(VOLUME_RAMP_TASK):
+            self.scheduler.schedule(0, self.tick, VOLUME_RAMP_TASK)
+
+    def cancel(self, groupIndex):
+        self.ramps.pop(groupIndex, None)
+
+    def isRamping(self, groupIndex):
+        return groupIndex in self.ramps
+
+    def getCurrentValue(self, groupIndex):
+        return self.getRampValue(self.ramps[groupIndex])
+
+    def getRampValue(self, ramp):
+        startValue, targetValue, startTime, duration = ramp
+        elapsed = self.scheduler.clock() - startTime
+        if duration <= 0 or elapsed >= duration:
+            return targetValue
+        return startValue + (targetValue - startValue) * elapsed / duration
+
+    def tick(self):
+        budget = RAMP_MAX_CALLS_PER_TICK
+        for groupIndex in list(self.ramps):
+            callCount = self.getCallCount(groupIndex)
+            # The first ramp of a tick always runs, so a group larger than the budget still progresses
+            if callCount > budget and budget < RAMP_MAX_CALLS_PER_TICK:
+                break
+            budget -= callCount
+            ramp = self.ramps.pop(groupIndex)
+            value = self.getRampValue(ramp)
+            self.applyValue(groupIndex, value)
+            if value != ramp[1]:
+                # Served ramps go to the back of the queue
+                self.ramps[groupIndex] = ramp
+
+        if self.ramps:
+            self.scheduler.schedule(0, self.tick, VOLUME_RAMP_TASK)
@@ -1,6 +1,7 @@
 # name=nano-controls-fl-studio
 # url=https://github.com/JulienMeziere/nano-kontrol-2-fl-studio
 
+from time import perf_counter
 from device import *
 from midi import *
 from transport import *
@@ -10,17 +11,64 @@ from general import *
 from ui import *
 from controllers.managers.general_controls_manager import GeneralControlsManager
 from controllers.managers.tracks_manager import TracksManager
+from controllers.managers.snapshot_manager import SnapshotManager
+from core.auto_repeater import AutoRepeater
+from core.control_unit import ControlUnit
 from core.fl_studio_api import FLStudioAPI
+from core.group_map_cache import GroupMapCache
 from core.hardware_interface import HardwareInterface
+from core.host_profiler import HostProfiler
+from core.midi_journal import MidiJournal
+from core.mixer_state_cache import MixerStateCache
+from core.refresh_coalescer import RefreshCoalescer
+from core.scheduler import Scheduler
+from core.snapshot_store import SnapshotStore
+from core.transport_state_cache import TransportStateCache
 from core.constants import *
 
+hostProfiler = HostProfiler() if PROFILE_HOST_CALLS else None
+midiJournal = MidiJournal(JOURNAL_FILE) if JOURNAL_FILE else None
 
+
+def profileCallback(callback):
+    """Attribute the host calls of an FL Studio callback to it when profiling is enabled"""
+    if hostProfiler is None:
+        return callback
+
+    def profiledCallback(*args):
+        hostProfiler.enterCallback(callback.__name__)
+        try:
+            return callback(*args)
+        finally:
+            hostProfiler.exitCallback()
+
+    return profiledCallback
+
+
+def dumpStats():
+    """Print the host call profile and LED stats (also callable from FL Studio's script output)"""
+    if hostProfiler is None:
+        print("Host call profiling is disabled, set ProfileHostCalls = True in config.py")
+    else:
+        print(hostProfiler.getReport())
+    for unit in units:
+        print(f"Unit {unit.index + 1}: {unit.hardwareInterface.getStats()}")
+    print(refreshCoalescer.getStats())
+    print(tracksManager.meter.getStats())
+
+
+@profileCallback
 def OnInit():
     print("*** nanoKONTROL2 script v1 by Julien MEZIERE ***")
+    startTime = perf_counter()
     global tracksManager
-    global controlsManager
-    global hardwareInterface
+    global units
+    global unitsByChannel
     global flApi
+    global scheduler
+    global snapshotManager
+    global transportState
+    global refreshCoalescer
     
     flApi = FLStudioAPI({
         'midiOutMsg': midiOutMsg,
@@ -43,6 +91,8 @@ def OnInit():
         'selectionStart': selectionStart,
         'selectionEnd': selectionEnd,
         'liveSelection': liveSelection,
+        'getRecPPB': getRecPPB,
+        'trackCount': trackCount,
         'getTrackName': getTrackName,
         'isTrackArmed': isTrackArmed,
         'armTrack': armTrack,
@@ -50,48 +100,184 @@ def OnInit():
         'muteTrack': muteTrack,
         'isTrackSolo': isTrackSolo,
         'soloTrack': soloTrack,
+        'getTrackVolume': getTrackVolume,
+        'getTrackPeaks': getTrackPeaks,
         'setTrackVolume': setTrackVolume
-    })
-    hardwareInterface = HardwareInterface(flApi)
+    }, hostProfiler)
+    units = [
+        ControlUnit(index, HardwareInterface(flApi, trackChannel, transportChannel))
+        for index, (trackChannel, transportChannel) in enumerate(UNIT_CHANNELS)]
+    unitsByChannel = buildUnitsByChannel()
+    scheduler = Scheduler()
+    mixerState = MixerStateCache(flApi, scheduler)
+    transportState = TransportStateCache(flApi, scheduler)
     
-    tracksManager = TracksManager(hardwareInterface, flApi)
-    controlsManager = GeneralControlsManager(
-        hardwareInterface, flApi, tracksManager.scanMixerTrackNames)
+    groupMapCache = GroupMapCache(GROUP_MAP_CACHE_FILE, GROUP_OVERRIDE_FILE)
+    tracksManager = TracksManager(units, flApi, scheduler, mixerState, groupMapCache)
+    snapshotManager = SnapshotManager(tracksManager, SnapshotStore(SNAPSHOT_FILE))
+    tracksManager.fingerprintRenameListeners.append(snapshotManager.followFingerprintRename)
+    refreshCoalescer = RefreshCoalescer(scheduler)
+    for unit in units:
+        unit.controlsManager = GeneralControlsManager(
+            unit.hardwareInterface, flApi, transportState, tracksManager.scanMixerTrackNames, dumpStats,
+            tracksManager.fadeOutAll, tracksManager.muteAllGroups, tracksManager.unmuteAllGroups,
+            tracksManager.toggleMetering,
+            AutoRepeater(scheduler, (AUTO_REPEAT_TASK, unit.index)))
+        unit.controlChangeTables = buildControlChangeTables(unit)
+        refreshCoalescer.register(HW_Dirty_LEDs, unit.controlsManager.updateButtonStates)
+    refreshCoalescer.register(HW_Dirty_Mixer_Controls, tracksManager.syncGroupStates)
+    refreshCoalescer.register(HW_Dirty_Names, tracksManager.checkRenamedTracks)
+    scheduler.schedule(0, resetButtonLights, INITIAL_LEDS_TASK)
+    print(f"Startup: {(perf_counter() - startTime) * 1000:.2f} ms")
+
+
+def buildUnitsByChannel():
+    """MIDI channel -> ControlUnit, channels of no unit go to the first one"""
+    unitsByChannel = [units[0]] * 16
+    for unit, (trackChannel, transportChannel) in zip(units, UNIT_CHANNELS):
+        unitsByChannel[trackChannel] = unitsByChannel[transportChannel] = unit
+    return unitsByChannel
+
+
+def resetButtonLights():
+    for unit in units:
+        unit.hardwareInterface.invalidate()
+    tracksManager.resetButtonLights()
+    for unit in units:
+        unit.controlsManager.updateButtonStates(True)
+
 
+def flushLights():
+    for unit in units:
+        unit.hardwareInterface.flush()
 
+
+@profileCallback
 def OnProjectLoad():
-    tracksManager.scanMixerTrackNames()
+    transportState.onProjectLoad()
+    tracksManager.loadGroupMap()
+    flushLights()
+
+
+@profileCallback
+def OnIdle():
+    scheduler.tick()
+    flushLights()
+    if midiJournal is not None:
+        midiJournal.flush()
+
+
+@profileCallback
+def OnDeInit():
+    if midiJournal is not None:
+        midiJournal.flush()
+
 
+@profileCallback
+def OnDirtyMixerTrack(index):
+    tracksManager.onMixerTrackDirty(index)
+    flushLights()
 
+
+@profileCallback
+def OnUpdateBeatIndicator(value):
+    transportState.invalidateSongPos()
+
+
+@profileCallback
 def OnRefresh(flag):
-    if flag == HW_Dirty_LEDs or flag == HW_DIRTY_LEDS_ALTERNATIVE:
-        controlsManager.updateButtonStates()
+    refreshCoalescer.onRefresh(flag)
 
 
+@profileCallback
 def OnControlChange(event):
+    if midiJournal is not None:
+        midiJournal.record(event)
     event.handled = True
-    button = event.data1
-
-    if button >= TRACKS_FIRST_FADER and button <= TRACKS_LAST_FADER:  # Handle mixer faders
-        tracksManager.volumeFader(event.data1, event.data2)
-    elif button >= TRACKS_FIRST_BUTTON and button <= TRACKS_LAST_BUTTON:  # Handle S,M,R buttons
-        if event.data2 == 0:
-            return
-
-        # trackButton = 0 --> 'S' button (Solo)
-        # trackButton = 1 --> 'M' button (Mute)
-        # trackButton = 2 --> 'R' button (Arm/Record)
-        trackButton = (button - TRACKS_FIRST_BUTTON) % 3
-
-        if trackButton == 0:
-            tracksManager.soloGroup(button)
-        elif trackButton == 1:
-            tracksManager.muteGroup(button)
-        elif trackButton == 2:
-            tracksManager.armTrack(button)
-    elif button >= FIRST_KNOB and button <= LAST_KNOB:
-        event.handled = False
-    elif event.data2 == 0:  # PRESS END
-        controlsManager.onPressEnd(button)
-    elif event.data2 > 0:  # PRESS START
-        controlsManager.onPressStart(button)
+    unit = unitsByChannel[event.midiChan]
+    unit.controlChangeTables[unit.controlsManager.modifierIndex][event.data1](event)
+    flushLights()
+
+
+def buildControlChangeTables(unit):
+    """
+    One CC number -> handler table per modifier combination of the unit's GeneralControlsManager,
+    so each incoming event costs a single lookup
+    """
+    # Actions indexed by BUTTON_ROLE: SOLO_ROLE --> 'S', MUTE_ROLE --> 'M', ARM_ROLE --> 'R'
+    defaultTable = buildControlChangeHandlers(unit, [
+        makeGroupAction(unit, tracksManager.soloGroup),
+        makeGroupAction(unit, tracksManager.muteGroup),
+        makeGroupAction(unit, tracksManager.armTrack)], False)
+    if NB_BANKS > 1:
+        modeMuteAction = lambda button: tracksManager.selectBank(unit, BUTTON_STRIP_INDEX[button])
+    else:
+        modeMuteAction = makeGroupAction(unit, tracksManager.muteGroup)
+    modeTable = buildControlChangeHandlers(
+        unit, [snapshotManager.recallSnapshot, modeMuteAction, snapshotManager.storeSnapshot], True)
+
+    tables = [None] * 4
+    tables[0] = tables[SELECTION_MODIFIER] = defaultTable
+    tables[MODE_MODIFIER] = tables[MODE_MODIFIER | SELECTION_MODIFIER] = modeTable
+    return tables
+
+
+def buildControlChangeHandlers(unit, trackButtonActions, isModeCombo):
+    handleGeneralButton = makeGeneralButtonHandler(unit.controlsManager)
+    handlers = [handleGeneralButton] * 128
+
+    handleFader = makeFaderHandler(unit, isModeCombo)
+    for fader in range(TRACKS_FIRST_FADER, TRACKS_LAST_FADER + 1):
+        handlers[fader] = handleFader
+
+    for button in range(TRACKS_FIRST_BUTTON, TRACKS_LAST_BUTTON + 1):
+        action = trackButtonActions[BUTTON_ROLE[button]]
+        handlers[button] = makeTrackButtonHandler(unit.controlsManager, action, isModeCombo)
+
+    for knob in range(FIRST_KNOB, LAST_KNOB + 1):
+        handlers[knob] = handleKnob
+
+    return handlers
+
+
+def makeGroupAction(unit, groupAction):
+    """Button ID -> group index in the unit's current bank"""
+    return lambda button: groupAction(unit.getGroupIndex(button))
+
+
+def makeTrackButtonHandler(controlsManager, action, isModeCombo):
+    def handleTrackButton(event):
+        if event.data2 > 0:
+            action(event.data1)
+
+    def handleModeComboTrackButton(event):
+        if event.data2 > 0:
+            controlsManager.useModeCombo()
+            action(event.data1)
+
+    return handleModeComboTrackButton if isModeCombo else handleTrackButton
+
+
+def makeFaderHandler(unit, isModeCombo):
+    def handleFader(event):
+        tracksManager.volumeFader(unit.getFaderGroupIndex(event.data1), event.data2)
+
+    def handleFadeFader(event):
+        unit.controlsManager.useModeCombo()
+        tracksManager.fadeGroupTo(unit.getFaderGroupIndex(event.data1), event.data2)
+
+    return handleFadeFader if isModeCombo else handleFader
+
+
+def handleKnob(event):
+    event.handled = False
+
+
+def makeGeneralButtonHandler(controlsManager):
+    def handleGeneralButton(event):
+        if event.data2 == 0:  # PRESS END
+            controlsManager.onPressEnd(event.data1)
+        else:  # PRESS START
+            controlsManager.onPressStart(event.data1)
+
+    return handleGeneralButton
@@ -0,0 +1 @@
+# Offline tools (mock FL Studio host, benchmarks)
@@ -0,0 +1,311 @@
+"""
+Offline benchmark of the script against MockFLHost.
+Run from the repository root: python -m tools.benchmark
+"""
+import contextlib
+import io
+from time import perf_counter
+from tools.mock_fl_host import MIDI_CONSTANTS, MockFLHost, buildGroupedTrackNames
+from core.constants import *
+
+
+def percentile(sortedValues, fraction):
+    if not sortedValues:
+        return 0.0
+    index = min(len(sortedValues) - 1, int(round(fraction * (len(sortedValues) - 1))))
+    return sortedValues[index]
+
+
+class ScenarioResult:
+    def __init__(self, name):
+        self.name = name
+        self.latencies = []
+        self.callCounts = {}
+
+    def report(self):
+        latencies = sorted(self.latencies)
+        totalCalls = sum(self.callCounts.values())
+        nbEvents = max(1, len(latencies))
+        topCalls = sorted(self.callCounts.items(), key=lambda item: -item[1])[:4]
+        print(f"{self.name}")
+        print(f"  events: {len(latencies)}"
+              f"  mean: {sum(latencies) / nbEvents * 1e6:.1f} us"
+              f"  p50: {percentile(latencies, 0.5) * 1e6:.1f} us"
+              f"  p95: {percentile(latencies, 0.95) * 1e6:.1f} us"
+              f"  max: {percentile(latencies, 1.0) * 1e6:.1f} us")
+        print(f"  host calls: {totalCalls} ({totalCalls / nbEvents:.1f} per event)"
+              f"  top: {', '.join(f'{name}={count}' for name, count in topCalls)}")
+
+
+def loadProject(host):
+    """Start the script and let the project load scan finish"""
+    host.loadScript()
+    host.script.OnProjectLoad()
+    # Let the scan and the LED flash finish so they are not counted in the scenario
+    while host.script.scheduler.tasks:
+        host.idle()
+    host.resetCounts()
+
+
+def runScenario(name, events, trackNames=None):
+    """
+    events: list of callables taking the host. Each one is timed as one event,
+    followed by an idle tick so deferred work is counted in the host calls.
+    """
+    host = MockFLHost(trackNames)
+    loadProject(host)
+
+    result = ScenarioResult(name)
+    for event in events:
+        startTime = perf_counter()
+        event(host)
+        result.latencies.append(perf_counter() - startTime)
+        host.idle()
+    result.callCounts = dict(host.callCounts)
+    return result
+
+
+def press(button):
+    return lambda host: host.sendControlChange(button, 127)
+
+
+def release(button):
+    return lambda host: host.sendControlChange(button, 0)
+
+
+def click(button):
+    return [press(button), release(button)]
+
+
+def projectLoadEvents():
+    return [lambda host: host.script.OnProjectLoad() for index in range(20)]
+
+
+def backgroundRescanScenario():
+    """Idle ticks of time-sliced rescans, with a fader moved on every tick"""
+    host = MockFLHost()
+    loadProject(host)
+
+    result = ScenarioResult('full mixer rescan (idle ticks while scanning)')
+    for index in range(20):
+        host.script.tracksManager.scanMixerTrackNames()
+        value = 0
+        while True:
+            host.sendControlChange(TRACKS_FIRST_FADER, value % 128)
+            value += 1
+            startTime = perf_counter()
+            host.idle()
+            result.latencies.append(perf_counter() - startTime)
+            if host.script.tracksManager.scanJob is None:
+                break
+    result.callCounts = dict(host.callCounts)
+    return result
+
+
+def renameTrack(trackIndex, trackName):
+    def rename(host):
+        host.renameTrack(trackIndex, trackName)
+        host.idle()
+    return rename
+
+
+def trackRenameEvents():
+    """Move tracks between groups by renaming them, picked up from the mixer-dirty notifications and names refresh"""
+    events = []
+    for trackIndex in range(1, 41):
+        events.append(renameTrack(trackIndex, f"Renamed {trackIndex} ({(trackIndex + 2) % NB_GROUPS + 1})"))
+    return events
+
+
+def soloMuteArmEvents():
+    events = []
+    for strip in range(NB_STRIPS):
+        firstButton = TRACKS_FIRST_BUTTON + strip * 3
+        for button in (firstButton, firstButton, firstButton + 1, firstButton + 1, firstButton + 2, firstButton + 2):
+            events += click(button)
+    return events
+
+
+def muteAllEvents():
+    """MODE + MARKER PREV / NEXT: mute and unmute every group as one batch"""
+    events = []
+    for index in range(20):
+        for button in (MARKER_PREV_BUTTON, MARKER_NEXT_BUTTON):
+            events += [press(MODE_BUTTON)] + click(button) + [release(MODE_BUTTON)]
+    return events
+
+
+def faderSweepEvents():
+    events = []
+    for value in list(range(128)) + list(range(127, -1, -1)):
+        for fader in range(TRACKS_FIRST_FADER, TRACKS_LAST_FADER + 1):
+            events.append(lambda host, fader=fader, value=value: host.sendControlChange(fader, value))
+    return events
+
+
+def markerNavigationEvents():
+    events = []
+    for index in range(100):
+        events += click(MARKER_NEXT_BUTTON)
+    for index in range(100):
+        events += click(MARKER_PREV_BUTTON)
+    return events
+
+
+def selectionEvents():
+    """Create a 4-bar selection, step it along the arrangement and toggle it off/on with both markers"""
+    events = [press(MARKER_SET_BUTTON)] + click(MARKER_NEXT_BUTTON) + [release(MARKER_SET_BUTTON)]
+    for index in range(50):
+        events += [press(MARKER_SET_BUTTON)] + click(PREV_TRACK_BUTTON) + [release(MARKER_SET_BUTTON)]
+    for index in range(25):
+        events += [press(MARKER_PREV_BUTTON), press(MARKER_NEXT_BUTTON), release(MARKER_PREV_BUTTON), release(MARKER_NEXT_BUTTON)]
+    return events
+
+
+def refreshBurstScenario():
+    """Playback refresh bursts: 10 OnRefresh(LEDs | mixer controls) per idle tick"""
+    host = MockFLHost()
+    loadProject(host)
+    flag = MIDI_CONSTANTS['HW_Dirty_LEDs'] | MIDI_CONSTANTS['HW_Dirty_Mixer_Controls']
+
+    result = ScenarioResult('refresh bursts (10 OnRefresh per idle tick)')
+    for burst in range(50):
+        for repeat in range(10):
+            startTime = perf_counter()
+            host.script.OnRefresh(flag)
+            result.latencies.append(perf_counter() - startTime)
+        host.idle()
+    result.callCounts = dict(host.callCounts)
+    return result
+
+
+def fadeOutAllScenario():
+    """MODE + STOP fade of every group, on a simulated 10 ms idle tick clock"""
+    host = MockFLHost(buildGroupedTrackNames(masterTracksPerGroup=3))
+    loadProject(host)
+    ramps = host.script.tracksManager.volumeRamps
+    simulatedTime = [0.0]
+    host.script.scheduler.clock = lambda: simulatedTime[0]
+
+    result = ScenarioResult(f'fade out all (idle ticks, at most {RAMP_MAX_CALLS_PER_TICK} volume calls each)')
+    host.sendControlChange(MODE_BUTTON, 127)
+    host.sendControlChange(STOP_BUTTON, 127)
+    host.sendControlChange(MODE_BUTTON, 0)
+    while ramps.ramps:
+        simulatedTime[0] += 0.01
+        startTime = perf_counter()
+        host.idle()
+        result.latencies.append(perf_counter() - startTime)
+    result.callCounts = dict(host.callCounts)
+    return result
+
+
+def heldMarkerScenario():
+    """MARKER NEXT held for 4 seconds, on a simulated 10 ms idle tick clock"""
+    host = MockFLHost()
+    loadProject(host)
+    simulatedTime = [0.0]
+    host.script.scheduler.clock = lambda: simulatedTime[0]
+    host.script.transportState.clock = host.script.scheduler.clock
+
+    result = ScenarioResult('held MARKER NEXT (4 s of auto-repeat, idle ticks)')
+    host.sendControlChange(MARKER_NEXT_BUTTON, 127)
+    while simulatedTime[0] < 4.0:
+        simulatedTime[0] += 0.01
+        startTime = perf_counter()
+        host.idle()
+        result.latencies.append(perf_counter() - startTime)
+    host.sendControlChange(MARKER_NEXT_BUTTON, 0)
+    result.callCounts = dict(host.callCounts)
+    bars = host.songPos // (host.ppq * host.beatsPerBar)
+    result.name += f' -> bar {bars}'
+    return result
+
+
+def meteringScenario():
+    """Clip metering (MODE + RECORD) of 3 masters per group while a fader moves, on a simulated 10 ms idle clock"""
+    host = MockFLHost(buildGroupedTrackNames(masterTracksPerGroup=3))
+    loadProject(host)
+    simulatedTime = [0.0]
+    host.script.scheduler.clock = lambda: simulatedTime[0]
+    host.sendControlChange(MODE_BUTTON, 127)
+    host.sendControlChange(RECORD_BUTTON, 127)
+    host.sendControlChange(MODE_BUTTON, 0)
+    host.resetCounts()
+
+    result = ScenarioResult(f'metering + fader moves (idle ticks, at most {METER_READS_PER_TICK} peak reads each)')
+    firstMaster = len(host.trackNames) - NB_GROUPS * 3
+    for tick in range(500):
+        # One master clips for 0.5 s every second, moving from group to group
+        clipping = firstMaster + (tick // 100) % (NB_GROUPS * 3)
+        host.peaks = [0.5] * len(host.trackNames)
+        if tick % 100 < 50:
+            host.peaks[clipping] = 1.2
+        simulatedTime[0] += 0.01
+        host.sendControlChange(TRACKS_FIRST_FADER, tick % 128)
+        startTime = perf_counter()
+        host.idle()
+        result.latencies.append(perf_counter() - startTime)
+    result.callCounts = dict(host.callCounts)
+    return result
+
+
+def faderSweepWithoutIdle():
+    """Fast sweep: every CC of a group arrives before the next idle tick"""
+    host = MockFLHost()
+    loadProject(host)
+
+    result = ScenarioResult('fader sweep (8 CCs per idle tick)')
+    for value in range(128):
+        for repeat in range(8):
+            startTime = perf_counter()
+            host.sendControlChange(TRACKS_FIRST_FADER, value)
+            result.latencies.append(perf_counter() - startTime)
+        host.idle()
+    result.callCounts = dict(host.callCounts)
+    return result
+
+
+def startupScenario():
+    result = ScenarioResult('script startup (OnInit)')
+    for index in range(20):
+        host = MockFLHost()
+        host.loadScript()
+        startTime = perf_counter()
+        host.script.OnInit()
+        result.latencies.append(perf_counter() - startTime)
+        host.idle()
+        for name, count in host.callCounts.items():
+            result.callCounts[name] = result.callCounts.get(name, 0) + count
+    return result
+
+
+def main():
+    # Keep the script's own prints (banner, scan reports) out of the benchmark output
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = runAllScenarios()
+    for result in results:
+        result.report()
+
+
+def runAllScenarios():
+    return [
+        startupScenario(),
+        runScenario('project load (cached group map)', projectLoadEvents()),
+        backgroundRescanScenario(),
+        runScenario('track renames (incremental rescan)', trackRenameEvents()),
+        runScenario('solo/mute/arm on every group', soloMuteArmEvents()),
+        runScenario('mute all / unmute all', muteAllEvents()),
+        runScenario('fader sweep (idle tick after each CC)', faderSweepEvents()),
+        faderSweepWithoutIdle(),
+        refreshBurstScenario(),
+        fadeOutAllScenario(),
+        meteringScenario(),
+        runScenario('marker navigation', markerNavigationEvents()),
+        heldMarkerScenario(),
+        runScenario('selection moves and toggles', selectionEvents()),
+    ]
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+import importlib
+import os
+import sys
+import tempfile
+import types
+
+SCRIPT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPT_ROOT not in sys.path:
+    sys.path.insert(0, SCRIPT_ROOT)
+
+import core.constants
+from core.constants import *
+
+SCRIPT_MODULE = 'device_nanoKONTROL2'
+
+# Files the script reads and writes next to itself, redirected to the host's data folder
+DATA_FILE_CONSTANTS = ['SNAPSHOT_FILE', 'GROUP_MAP_CACHE_FILE', 'GROUP_OVERRIDE_FILE', 'JOURNAL_FILE']
+
+# Subset of FL Studio's `midi` module constants used by the script
+MIDI_CONSTANTS = {
+    'MIDI_CONTROLCHANGE': 0xB0,
+    'HW_Dirty_Mixer_Sel': 1,
+    'HW_Dirty_Mixer_Display': 2,
+    'HW_Dirty_Mixer_Controls': 4,
+    'HW_Dirty_LEDs': 256,
+    'HW_Dirty_Names': 16384,
+}
+
+# FL Studio module -> functions of MockFLHost exposed in it
+HOST_MODULES = {
+    'device': ['midiOutMsg'],
+    'transport': [
+        'globalTransport', 'start', 'stop', 'record', 'rewind', 'fastForward', 'isPlaying',
+        'isRecording', 'getLoopMode', 'setLoopMode', 'getSongPos', 'setSongPos'],
+    'arrangement': ['currentTime', 'selectionStart', 'selectionEnd', 'liveSelection'],
+    'mixer': [
+        'trackCount', 'getTrackName', 'isTrackArmed', 'armTrack', 'isTrackMuted', 'muteTrack',
+        'isTrackSolo', 'soloTrack', 'getTrackVolume', 'setTrackVolume', 'getTrackPeaks'],
+    'general': ['getRecPPB'],
+    'ui': ['showWindow', 'hideWindow'],
+}
+
+
+def buildGroupedTrackNames(nbGroups=NB_GROUPS, nbTracks=FL_TOTAL_NB_TRACKS + 1, masterTracksPerGroup=1):
+    """Spread `(N)` members over the whole mixer, with `[N]` masters for each group at the end"""
+    names = ['Master']
+    firstMasterTrack = nbTracks - nbGroups * masterTracksPerGroup
+    for trackIndex in range(1, firstMasterTrack):
+        names.append(f"Insert {trackIndex} ({(trackIndex - 1) % nbGroups + 1})")
+    for masterIndex in range(nbGroups * masterTracksPerGroup):
+        names.append(f"Bus [{masterIndex % nbGroups + 1}]")
+    return names
+
+
+class MockEvent:
+    def __init__(self, data1, data2, midiChan=0):
+        self.data1 = data1
+        self.data2 = data2
+        self.midiChan = midiChan
+        self.status = MIDI_CONSTANTS['MIDI_CONTROLCHANGE'] + midiChan
+        self.handled = False
+
+
+class MockFLHost:
+    """Pure-Python stand-in for the FL Studio modules imported by device_nanoKONTROL2.py"""
+
+    def __init__(self, trackNames=None, dataDir=None):
+        self.trackNames = list(trackNames) if trackNames is not None else buildGroupedTrackNames()
+        nbTracks = len(self.trackNames)
+        self.muted = [False] * nbTracks
+        self.armed = [False] * nbTracks
+        self.volumes = [0.8] * nbTracks
+        self.peaks = [0.0] * nbTracks
+        self.soloedTrack = -1
+        self.playing = False
+        self.recording = False
+        self.loopMode = 0
+        self.songPos = 0
+        self.selection = (-1, -1)
+        self.ppq = 96
+        self.beatsPerBar = 4
+        self.midiOut = []
+        self.dirtyTracks = []
+        self.pendingRefreshFlags = 0
+        self.callCounts = {}
+        self.script = None
+        self.dataDir = dataDir if dataDir is not None else tempfile.mkdtemp(prefix='mock_fl_host_')
+
+    # --> Host instrumentation
+
+    def installModules(self):
+        """Register fake `device`, `midi`, `transport`, ... modules so the script can be imported"""
+        midiModule = types.ModuleType('midi')
+        midiModule.__dict__.update(MIDI_CONSTANTS)
+        sys.modules['midi'] = midiModule
+
+        for moduleName, functionNames in HOST_MODULES.items():
+            module = types.ModuleType(moduleName)
+            for name in functionNames:
+                setattr(module, name, self.countCalls(name, getattr(self, name)))
+            sys.modules[moduleName] = module
+
+    def countCalls(self, name, func):
+        def countedFunction(*args):
+            self.callCounts[name] = self.callCounts.get(name, 0) + 1
+            return func(*args)
+        return countedFunction
+
+    def loadScript(self):
+        """
+        Import a fresh copy of the script against this host and run OnInit().
+        The script's data files (snapshots, group map cache) live in `dataDir`, a temporary folder by default.
+        """
+        self.installModules()
+        for name in DATA_FILE_CONSTANTS:
+            path = getattr(core.constants, name)
+            if path is not None:
+                setattr(core.constants, name, os.path.join(self.dataDir, os.path.basename(path)))
+        sys.modules.pop(SCRIPT_MODULE, None)
+        self.script = importlib.import_module(SCRIPT_MODULE)
+        self.script.OnInit()
+        return self.script
+
+    def resetCounts(self):
+        self.callCounts = {}
+        self.midiOut = []
+
+    def totalCalls(self):
+        return sum(self.callCounts.values())
+
+    def sendControlChange(self, data1, data2, midiChan=0):
+        event = MockEvent(data1, data2, midiChan)
+        self.script.OnControlChange(event)
+        return event
+
+    def idle(self):
+        """Deliver pending mixer notifications and refreshes, then give the script an idle tick"""
+        dirtyTracks = self.dirtyTracks
+        self.dirtyTracks = []
+        for trackIndex in dirtyTracks:
+            self.script.OnDirtyMixerTrack(trackIndex)
+        if self.pendingRefreshFlags:
+            refreshFlags = self.pendingRefreshFlags
+            self.pendingRefreshFlags = 0
+            self.script.OnRefresh(refreshFlags)
+        self.script.OnIdle()
+
+    def renameTrack(self, trackIndex, trackName):
+        """Like FL Studio: the track is reported dirty, then the names refresh is sent"""
+        self.trackNames[trackIndex] = trackName
+        self.markDirty(trackIndex)
+        self.pendingRefreshFlags |= MIDI_CONSTANTS['HW_Dirty_Names']
+
+    def markDirty(self, trackIndex):
+        if trackIndex not in self.dirtyTracks:
+            self.dirtyTracks.append(trackIndex)
+
+    # --> device
+
+    def midiOutMsg(self, message, channel=-1, data1=-1, data2=-1):
+        self.midiOut.append((message, channel, data1, data2))
+
+    # --> transport
+
+    def globalTransport(self, command, value, pmeFlags=0, flags=0):
+        return 1
+
+    def start(self):
+        self.playing = not self.playing
+
+    def stop(self):
+        self.playing = False
+        self.recording = False
+
+    def record(self):
+        self.recording = not self.recording
+
+    def rewind(self, startStop, flags=0):
+        pass
+
+    def fastForward(self, startStop, flags=0):
+        pass
+
+    def isPlaying(self):
+        return 1 if self.playing else 0
+
+    def isRecording(self):
+        return 1 if self.recording else 0
+
+    def getLoopMode(self):
+        return self.loopMode
+
+    def setLoopMode(self):
+        self.loopMode = 1 - self.loopMode
+
+    def getSongPos(self, mode=-1):
+        return self.songPos
+
+    def setSongPos(self, position, mode=-1):
+        self.songPos = position
+
+    # --> arrangement
+
+    def currentTime(self, snap):
+        return self.songPos
+
+    def selectionStart(self):
+        return self.selection[0] if self.selection[0] != self.selection[1] else -1
+
+    def selectionEnd(self):
+        return self.selection[1] if self.selection[0] != self.selection[1] else -1
+
+    def liveSelection(self, time, updateEnd):
+        if updateEnd:
+            self.selection = (self.selection[0], time)
+        else:
+            self.selection = (time, self.selection[1])
+
+    # --> general
+
+    def getRecPPB(self):
+        return self.ppq * self.beatsPerBar
+
+    # --> mixer
+
+    def trackCount(self):
+        return len(self.trackNames)
+
+    def getTrackName(self, index):
+        return self.trackNames[index]
+
+    def isTrackArmed(self, index):
+        return 1 if self.armed[index] else 0
+
+    def armTrack(self, index):
+        self.armed[index] = not self.armed[index]
+        self.markDirty(index)
+
+    def isTrackMuted(self, index):
+        return 1 if self.muted[index] else 0
+
+    def muteTrack(self, index, value=-1):
+        self.muted[index] = not self.muted[index] if value == -1 else value != 0
+        self.markDirty(index)
+
+    def isTrackSolo(self, index):
+        return 1 if self.soloedTrack == index else 0
+
+    def soloTrack(self, index, value=-1, mode=-1):
+        soloOn = self.soloedTrack != index if value == -1 else value != 0
+        self.soloedTrack = index if soloOn else -1
+        for trackIndex in range(1, len(self.trackNames)):
+            self.muted[trackIndex] = soloOn and trackIndex != index
+        self.markDirty(-1)
+
+    def getTrackVolume(self, index, mode=0):
+        return self.volumes[index]
+
+    def setTrackVolume(self, index, volume, pickupMode=0):
+        self.volumes[index] = volume
+        self.markDirty(index)
+
+    def getTrackPeaks(self, index, mode):
+        return self.peaks[index]
+
+    # --> ui
+
+    def showWindow(self, index):
+        pass
+
+    def hideWindow(self, index):
+        pass
@@ -0,0 +1,89 @@
+"""
+Replay a MIDI journal (JournalFile in config.py) through the script's handlers against MockFLHost.
+Run from the repository root:
+    python -m tools.replay_journal midi_journal.txt            # as fast as possible
+    python -m tools.replay_journal midi_journal.txt --recorded # at the recorded speed
+"""
+import argparse
+import contextlib
+import io
+from time import perf_counter, sleep
+from tools.benchmark import ScenarioResult, loadProject
+from tools.mock_fl_host import MockFLHost
+from core.midi_journal import MidiJournal
+
+
+class VirtualClock:
+    """Journal time for the script's scheduler and caches, so fast replays keep the recorded timing"""
+
+    def __init__(self):
+        self.baseTime = perf_counter()
+        self.elapsed = 0.0
+
+    def __call__(self):
+        return self.baseTime + self.elapsed
+
+
+def replayJournal(events, isRecordedSpeed, idleInterval, trackNames=None):
+    """
+    Feed the journal events to OnControlChange, with the idle ticks FL Studio would have given
+    the script every idleInterval seconds in between. Returns (ScenarioResult, wall time).
+    """
+    host = MockFLHost(trackNames)
+    loadProject(host)
+    clock = None
+    if not isRecordedSpeed:
+        clock = VirtualClock()
+        host.script.scheduler.clock = clock
+        host.script.transportState.clock = clock
+
+    result = ScenarioResult('journal replay (recorded speed)' if isRecordedSpeed else 'journal replay (as fast as possible)')
+    replayStart = perf_counter()
+    lastIdleTime = 0.0
+
+    def waitUntil(journalTime):
+        if clock is not None:
+            clock.elapsed = journalTime
+        else:
+            sleep(max(0.0, replayStart + journalTime - perf_counter()))
+
+    for eventTime, channel, data1, data2 in events:
+        while eventTime - lastIdleTime >= idleInterval:
+            lastIdleTime += idleInterval
+            waitUntil(lastIdleTime)
+            host.idle()
+
+        waitUntil(eventTime)
+        startTime = perf_counter()
+        host.sendControlChange(data1, data2, channel)
+        result.latencies.append(perf_counter() - startTime)
+
+    host.idle()
+    result.callCounts = dict(host.callCounts)
+    return result, perf_counter() - replayStart
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a nanoKONTROL2 MIDI journal against the mock FL Studio host')
+    parser.add_argument('journal', help='journal file written with JournalFile in config.py')
+    parser.add_argument('--recorded', action='store_true', help='replay at the recorded speed instead of as fast as possible')
+    parser.add_argument('--idle-ms', type=float, default=10.0, help='interval between simulated OnIdle ticks (default: 10 ms)')
+    arguments = parser.parse_args()
+
+    events = MidiJournal.read(arguments.journal)
+    if not events:
+        print(f"No events in {arguments.journal}")
+        return
+
+    # Keep the script's own prints out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        result, wallTime = replayJournal(events, arguments.recorded, arguments.idle_ms / 1000)
+    result.report()
+    handlerTime = sum(result.latencies)
+    print(f"  recorded: {events[-1][0]:.2f} s  replayed: {wallTime:.2f} s"
+          f"  throughput: {len(events) / max(wallTime, 1e-9):.0f} events/s"
+          f" ({len(events) / max(handlerTime, 1e-9):.0f} events/s in the handlers)")
+
+
+if __name__ == '__main__':
+    main()
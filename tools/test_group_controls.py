@@ -0,0 +1,166 @@
+"""
+Behavior of the group mute/solo buttons and snapshots against MockFLHost.
+Run from the repository root: python -m pytest tools
+"""
+import pytest
+from tools.benchmark import loadProject
+from tools.mock_fl_host import MIDI_CONSTANTS, MockFLHost
+from core.constants import *
+
+# Groups 1-7 get three members each, group 8 stays empty, the tracks after them are in no group
+GROUPED_NAMES = ['Master'] + [f"Insert {track} ({(track - 1) % 7 + 1})" for track in range(1, 22)]
+LAYOUT = GROUPED_NAMES + [f"Free {track}" for track in range(22, 119)] + [
+    f"Bus [{groupNumber}]" for groupNumber in range(1, 8)]
+FREE_TRACK = 30
+
+
+def createHost(trackNames=LAYOUT):
+    host = MockFLHost(trackNames)
+    loadProject(host)
+    return host
+
+
+def stripButton(strip, role):
+    return TRACKS_FIRST_BUTTON + strip * 3 + role
+
+
+def click(host, button, withMode=False):
+    """Press and release a button, then let the deferred steps and mixer notifications run"""
+    if withMode:
+        host.sendControlChange(MODE_BUTTON, 127)
+    host.sendControlChange(button, 127)
+    host.sendControlChange(button, 0)
+    if withMode:
+        host.sendControlChange(MODE_BUTTON, 0)
+    host.idle()
+    host.idle()
+
+
+def storeSnapshot(host, slot):
+    click(host, stripButton(slot, ARM_ROLE), True)
+
+
+def recallSnapshot(host, slot):
+    click(host, stripButton(slot, SOLO_ROLE), True)
+
+
+def testMuteGroupOnlyMutesItsTracks():
+    host = createHost()
+    tracksManager = host.script.tracksManager
+    click(host, stripButton(0, MUTE_ROLE))
+
+    assert tracksManager.state.isMuted(0)
+    for track in range(1, len(LAYOUT)):
+        assert host.muted[track] == (track in tracksManager.trackGroups[0])
+
+    click(host, stripButton(0, MUTE_ROLE))
+    assert not any(host.muted)
+
+
+def testSharedTrackIsUnmutedWithItsLastMutedGroup():
+    # Group 1 = tracks 1-4, group 2 = track 3 only
+    host = createHost(['Master', 'A (1)', 'B (1)', 'C (1)(2)', 'D (1)'] + [f"Free {track}" for track in range(5, 126)])
+    tracksManager = host.script.tracksManager
+    click(host, stripButton(0, MUTE_ROLE))
+    host.script.OnRefresh(MIDI_CONSTANTS['HW_Dirty_Mixer_Controls'])
+    host.idle()
+    click(host, stripButton(0, MUTE_ROLE))
+
+    assert not host.muted[3]
+    assert not tracksManager.state.isMuted(0)
+    assert not tracksManager.state.isMuted(1)
+
+
+def testSoloGroupSolosItAndUnsoloRestoresTheMixer():
+    host = createHost()
+    tracksManager = host.script.tracksManager
+    groupTracks = tracksManager.trackGroups[1]
+    click(host, stripButton(1, SOLO_ROLE))
+
+    assert host.soloedTrack == groupTracks[0]
+    assert not any(host.muted[track] for track in groupTracks)
+    assert host.muted[FREE_TRACK]
+    assert tracksManager.state.soloed == 1
+
+    click(host, stripButton(1, SOLO_ROLE))
+    assert host.soloedTrack == -1
+    assert not any(host.muted)
+    assert tracksManager.state.soloed == -1
+
+
+def testRecallWithSoloLightOnEmptyGroup():
+    host = createHost()
+    tracksManager = host.script.tracksManager
+    storeSnapshot(host, 0)
+    # Mute all, then unmute the empty group 8: its solo LED shows the only unmuted group
+    click(host, MARKER_PREV_BUTTON, True)
+    click(host, stripButton(7, MUTE_ROLE))
+    assert tracksManager.state.soloed == 7
+
+    recallSnapshot(host, 0)
+    assert tracksManager.state.muted == 0
+    assert not any(host.muted)
+
+
+def testRecallOfSingleUnmutedGroupOnlyRestoresMutes():
+    host = createHost()
+    tracksManager = host.script.tracksManager
+    click(host, MARKER_PREV_BUTTON, True)
+    click(host, stripButton(0, MUTE_ROLE))
+    storeSnapshot(host, 1)
+    click(host, MARKER_NEXT_BUTTON, True)
+
+    recallSnapshot(host, 1)
+    assert host.soloedTrack == -1
+    assert not host.muted[FREE_TRACK]
+    assert not tracksManager.state.isMuted(0)
+    assert all(tracksManager.state.isMuted(groupIndex) for groupIndex in range(1, 8))
+
+
+def testRecallOfSoloedGroup():
+    host = createHost()
+    tracksManager = host.script.tracksManager
+    click(host, stripButton(1, SOLO_ROLE))
+    storeSnapshot(host, 2)
+    click(host, stripButton(1, SOLO_ROLE))
+
+    recallSnapshot(host, 2)
+    assert host.soloedTrack == tracksManager.trackGroups[1][0]
+    assert tracksManager.state.soloed == 1
+
+
+def testRecallRestoresMasterVolumesChangedInFL():
+    host = createHost()
+    tracksManager = host.script.tracksManager
+    masters = [tracksManager.trackGroupMasters[groupIndex][0] for groupIndex in range(3)]
+    tracksManager.volumeFader(2, 100)
+    host.idle()
+    storeSnapshot(host, 0)
+    storedVolumes = [host.volumes[track] for track in masters]
+
+    for track, volume in zip(masters, (0.2, 0.1, 0.05)):
+        host.volumes[track] = volume
+        host.markDirty(track)
+    host.idle()
+
+    recallSnapshot(host, 0)
+    assert [host.volumes[track] for track in masters] == pytest.approx(storedVolumes)
+
+
+def testSnapshotSurvivesTrackRename():
+    host = createHost()
+    tracksManager = host.script.tracksManager
+    storeSnapshot(host, 0)
+    fingerprint = tracksManager.mixerFingerprint
+    host.renameTrack(4, 'Renamed (2)')
+    host.idle()
+    assert tracksManager.mixerFingerprint != fingerprint
+
+    click(host, stripButton(0, MUTE_ROLE))
+    recallSnapshot(host, 0)
+    assert not tracksManager.state.isMuted(0)
+
+    # The slot is also found when the renamed project is loaded again
+    reloadedHost = MockFLHost(host.trackNames, host.dataDir)
+    loadProject(reloadedHost)
+    assert 0 in reloadedHost.script.snapshotManager.getSnapshots()
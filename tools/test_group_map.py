@@ -0,0 +1,104 @@
+"""
+Behavior of the group map (scan, cache, override file and rename patching) against MockFLHost.
+Run from the repository root: python -m pytest tools
+"""
+import json
+import os
+import pytest
+from tools.benchmark import loadProject
+from tools.mock_fl_host import MockFLHost
+from core.constants import *
+
+
+def createHost(trackNames=None, dataDir=None):
+    host = MockFLHost(trackNames, dataDir)
+    loadProject(host)
+    return host
+
+
+def testRenameMovesTrackBetweenGroups():
+    host = createHost()
+    tracksManager = host.script.tracksManager
+    assert 1 in tracksManager.trackGroups[0]
+
+    host.renameTrack(1, 'Insert 1 (3)')
+    host.idle()
+    assert 1 not in tracksManager.trackGroups[0]
+    assert 1 in tracksManager.trackGroups[2]
+    assert host.callCounts == {'getTrackName': 1}
+
+
+def testAutomationDoesNotReadTrackNames():
+    host = createHost()
+    for tick in range(20):
+        for track in range(1, 41):
+            host.volumes[track] = tick / 20
+            host.markDirty(track)
+        host.idle()
+    assert 'getTrackName' not in host.callCounts
+
+
+def testCacheHitLoadsTheScannedGroupMap(capsys):
+    scannedHost = createHost()
+    cachedHost = MockFLHost(scannedHost.trackNames, scannedHost.dataDir)
+    cachedHost.loadScript()
+    capsys.readouterr()
+    cachedHost.script.OnProjectLoad()
+
+    assert 'cache hit' in capsys.readouterr().out
+    assert cachedHost.script.tracksManager.scanJob is None
+    assert cachedHost.script.tracksManager.trackGroups == scannedHost.script.tracksManager.trackGroups
+    assert cachedHost.callCounts['getTrackName'] == len(cachedHost.trackNames)
+
+
+def testProjectsFromOneTemplateDoNotShareTheirGroupMap():
+    templateHost = createHost()
+    trackNames = list(templateHost.trackNames)
+    trackNames[1] = 'Insert 1 (2)'
+    host = createHost(trackNames, templateHost.dataDir)
+    assert 1 not in host.script.tracksManager.trackGroups[0]
+    assert 1 in host.script.tracksManager.trackGroups[1]
+
+
+def testOverrideFilePinsGroups():
+    host = MockFLHost()
+    with open(os.path.join(host.dataDir, os.path.basename(GROUP_OVERRIDE_FILE)), 'w') as overrideFile:
+        json.dump({'groups': {'1': {'members': [5, 6], 'masters': [7]}}}, overrideFile)
+    loadProject(host)
+    assert host.script.tracksManager.trackGroups[0] == [5, 6, 7]
+    assert host.script.tracksManager.trackGroupMasters[0] == [7]
+
+
+@pytest.mark.parametrize('override', [
+    {'groups': {'one': {'members': [1]}}},
+    {'groups': {'1': {'members': ['a', 2]}}},
+    {'groups': [1, 2]},
+    [1, 2],
+])
+def testMalformedOverrideFileFallsBackToScan(override):
+    host = MockFLHost()
+    with open(os.path.join(host.dataDir, os.path.basename(GROUP_OVERRIDE_FILE)), 'w') as overrideFile:
+        json.dump(override, overrideFile)
+    loadProject(host)
+    tracksManager = host.script.tracksManager
+    assert tracksManager.trackGroups == createHost().script.tracksManager.trackGroups
+
+    tracksManager.scanMixerTrackNames()
+    while host.script.scheduler.tasks:
+        host.idle()
+    assert tracksManager.mixerFingerprint != GROUP_OVERRIDE_FINGERPRINT
+
+
+def testMalformedCacheEntryFallsBackToScan():
+    scannedHost = createHost()
+    cachePath = os.path.join(scannedHost.dataDir, os.path.basename(GROUP_MAP_CACHE_FILE))
+    with open(cachePath) as cacheFile:
+        entries = json.load(cacheFile)
+    for entry in entries.values():
+        del entry['masters']
+    with open(cachePath, 'w') as cacheFile:
+        json.dump(entries, cacheFile)
+
+    host = createHost(scannedHost.trackNames, scannedHost.dataDir)
+    assert host.script.tracksManager.trackGroups == scannedHost.script.tracksManager.trackGroups
+    assert host.script.tracksManager.trackGroupMasters == scannedHost.script.tracksManager.trackGroupMasters